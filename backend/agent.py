@@ -6,15 +6,18 @@ Uses 2 LLM nodes:
 """
 
 import os
+from functools import lru_cache
 from typing import TypedDict, Literal
 from datetime import datetime
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 import json
 from logger.custom_logging import CustomLogger
 from utils.date_tools import get_current_context
+from app.utils.date_tools import resolve_target_date
+from app.utils.json_extract import extract_json
+from app.services.llm_clients import get_chat_model
 
 load_dotenv()
 logger = CustomLogger().get_logger(__name__)
@@ -40,13 +43,14 @@ class NoteState(TypedDict):
 # LLM INITIALIZATION
 # ==========================================
 def get_llm():
-    """Initialize fast LLM - tries Google Gemini first, falls back to OpenAI"""
+    """Shared fast LLM client - built once per process, reused by every node"""
     
     # Fall back to OpenAI
     openai_key = os.getenv("OPENAI_API_KEY")
     if openai_key:
-        return ChatOpenAI(
-            model="gpt-4o-mini",
+        return get_chat_model(
+            "openai",
+            "gpt-4o-mini",
             temperature=0.1,
             api_key=openai_key
         )
@@ -66,16 +70,16 @@ def content_formatter_node(state: NoteState) -> NoteState:
     
     llm = get_llm()
     
-    # Get current date context
-    date_context = get_current_context()
-    
-    system_prompt = f"""You are a smart assistant for classifying notes and extracting dates.
-{date_context}
-
-Your Tasks:
-1. Classify input as: "Note", "Idea", or "Task"
-2. Extract/Generate a short Title.
-3. **EXTRACT TARGET DATE (Crucial):**
+    # Resolve the date locally when we can; the LLM only does date math
+    # for inputs the resolver can't pin down
+    resolved_date = resolve_target_date(state["input_text"])
+    if resolved_date:
+        date_context = ""
+        date_step = f"3. **TARGET DATE:** Already resolved to {resolved_date}, do not output it."
+        date_field = ""
+    else:
+        date_context = f"\n{get_current_context()}"
+        date_step = """3. **EXTRACT TARGET DATE (Crucial):**
    - Format: YYYY-MM-DD
    - **"Next Friday" logic:**
      - If today is Monday-Wednesday, "this Friday" = coming Friday.
@@ -85,7 +89,15 @@ Your Tasks:
      - If Today is 2026-02-16 (Monday):
        - "This Friday" -> 2026-02-20
        - "Next Friday" -> 2026-02-27
-   - Default: If no date specified, use Today's date.
+   - Default: If no date specified, use Today's date."""
+        date_field = '\n    "target_date": "YYYY-MM-DD",'
+
+    system_prompt = f"""You are a smart assistant for classifying notes and extracting dates.{date_context}
+
+Your Tasks:
+1. Classify input as: "Note", "Idea", or "Task"
+2. Extract/Generate a short Title.
+{date_step}
 4. **FORMAT CONTENT (Crucial):**
    - **IF TASK:** 
      - Format as a CHECKLIST: Start with `- [ ]`.
@@ -99,8 +111,7 @@ Your Tasks:
 Output JSON only:
 {{
     "category": "Note|Idea|Task",
-    "title": "Title",
-    "target_date": "YYYY-MM-DD",
+    "title": "Title",{date_field}
     "formatted_content": "Markdown...",
     "tags": ["tag1"]
 }}"""
@@ -115,21 +126,14 @@ Output JSON only:
         
         response = llm.invoke(messages)
         
-        # Parse JSON response
-        # Extract JSON from markdown code blocks if present
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif content.startswith("```"):
-            content = content.split("```")[1].split("```")[0].strip()
-            
-        result = json.loads(content)
+        # Parse JSON response (fenced, wrapped in prose or truncated)
+        result = extract_json(response.content)
         
         # Update state
         state["category"] = result["category"]
         state["title"] = result["title"]
         state["formatted_content"] = result["formatted_content"]
-        state["target_date"] = result.get("target_date", datetime.now().strftime("%Y-%m-%d"))
+        state["target_date"] = resolved_date or result.get("target_date", datetime.now().strftime("%Y-%m-%d"))
         state["tags"] = result.get("tags", [])
         state["error"] = None
         
@@ -193,13 +197,7 @@ Generate status and any additional relevant tags."""
         response = llm.invoke(messages)
         
         # Parse JSON
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif content.startswith("```"):
-            content = content.split("```")[1].split("```")[0].strip()
-            
-        result = json.loads(content)
+        result = extract_json(response.content)
         
         # Merge tags and add Category as a tag
         all_tags = list(set(tags + result.get("additional_tags", []) + [category]))
@@ -247,8 +245,9 @@ Generate status and any additional relevant tags."""
 # ==========================================
 # GRAPH BUILDER
 # ==========================================
+@lru_cache(maxsize=1)
 def create_agent_graph():
-    """Build the LangGraph workflow"""
+    """Build the LangGraph workflow (compiled once per process)"""
     
     workflow = StateGraph(NoteState)
     
@@ -1,26 +1,30 @@
 
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from fastapi import Depends
 from sqlmodel import Session
-from app.db.session import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.session import get_session, get_async_session
 from app.core.security import get_current_user_id
 from app.models.user import User
+from app.services.user_service import user_service
 
 def get_db() -> Generator[Session, None, None]:
     yield from get_session()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async for session in get_async_session():
+        yield session
+
 def get_current_user(
     db: Session = Depends(get_db),
     clerk_id: str = Depends(get_current_user_id)
 ) -> User:
-    # First, try to find user in our local DB
-    user = db.query(User).filter(User.clerk_id == clerk_id).first()
-    
-    # If using Clerk, we might want to auto-create user on first login
-    if not user:
-        user = User(clerk_id=clerk_id, email=f"{clerk_id}@clerk.dev") # Placeholder email
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        
-    return user
+    # Served from the in-memory cache once warm; first login does an
+    # insert-or-ignore so concurrent requests can't create duplicates
+    return user_service.get_or_create(db, clerk_id)
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    clerk_id: str = Depends(get_current_user_id)
+) -> User:
+    return await user_service.aget_or_create(db, clerk_id)
@@ -1,6 +1,7 @@
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import notes
+from app.api.v1.endpoints import metrics, notes
 
 api_router = APIRouter()
 api_router.include_router(notes.router, prefix="/notes", tags=["notes"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -0,0 +1,32 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from app.api import deps
+from app.core.security import token_cache
+from app.models.user import User
+from app.services.llm_service import get_llm_service
+from app.services.llm_metrics import llm_metrics
+from app.services.note_writer import note_writer
+
+router = APIRouter()
+
+@router.get("")
+async def get_metrics(current_user: User = Depends(deps.get_current_user_async)) -> Any:
+    """
+    Process-wide counters since startup: per graph node and per provider
+    call timings, tokens and estimated cost, plus cache, router and write
+    path stats.
+    """
+    metrics = {
+        "pipeline": llm_metrics.snapshot(),
+        "token_cache": token_cache.stats(),
+        "note_writer": note_writer.stats(),
+    }
+    try:
+        service = get_llm_service()
+    except ValueError:
+        # No provider configured
+        return metrics
+    metrics["llm_cache"] = service.cache.stats()
+    if hasattr(service.llm, "stats"):
+        metrics["llm_router"] = service.llm.stats()
+    return metrics
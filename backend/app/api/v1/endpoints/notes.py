@@ -1,105 +1,363 @@
 
-from typing import Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlmodel import Session
+import json
+from datetime import date
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.api import deps
+from app.core.config import settings
 from app.models.user import User
 from app.models.note import Note
-from app.schemas.note import ProcessedNote
-from app.services.llm_service import LLMService
+from app.schemas.note import (
+    CalendarDay, NoteBatchItem, NoteBatchRequest, NoteBatchResponse, NotePage, NoteResponse, NoteSearchHit, ProcessedNote, TagCount
+)
+from app.services.dedup_service import dedup_index
+from app.services.export_service import export_service
+from app.services.llm_service import get_llm_service
+from app.services.note_service import note_service
+from app.services.note_writer import note_writer
 from app.services.notion_service import notion_service
+from app.services.result_cache import normalize_input
 from app.services.voice_service import voice_service
-from app.utils.data_parsing import markdown_to_notion_blocks
 
 router = APIRouter()
 
-@router.post("/process", response_model=ProcessedNote)
-async def process_note(
-    text: Optional[str] = Form(None),
-    audio: Optional[UploadFile] = File(None),
-    current_user: User = Depends(deps.get_current_user),
-    db: Session = Depends(deps.get_db)
+@router.get("", response_model=NotePage)
+async def list_notes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    target_date: Optional[str] = None,
+    tag: Optional[str] = None,
+    current_user: User = Depends(deps.get_current_user_async),
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> Any:
     """
-    Process text or audio input. 
-    1. Transcribe audio if present.
-    2. Process text with LLM.
-    3. Sync to Notion.
-    4. Save to local DB.
+    Note history for the current user, newest first.
+    Pass the returned `next_cursor` back as `cursor` to get the next page.
+    """
+    try:
+        notes, next_cursor = await note_service.list_notes(
+            db,
+            owner_id=current_user.clerk_id,
+            limit=limit,
+            cursor=cursor,
+            category=category,
+            status=status,
+            target_date=target_date,
+            tag=tag,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return NotePage(
+        items=[NoteResponse.model_validate(n, from_attributes=True) for n in notes],
+        next_cursor=next_cursor,
+    )
+
+@router.get("/search", response_model=List[NoteSearchHit])
+async def search_notes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(deps.get_current_user_async),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """
+    Full-text search over the current user's note titles and content.
+    Results are ranked by relevance and include a highlighted snippet.
+    """
+    hits = await note_service.search_notes(db, owner_id=current_user.clerk_id, q=q, limit=limit)
+    return [
+        NoteSearchHit(**NoteResponse.model_validate(note, from_attributes=True).model_dump(), snippet=snippet, rank=rank)
+        for note, snippet, rank in hits
+    ]
+
+@router.get("/tags", response_model=List[TagCount])
+async def list_tags(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(deps.get_current_user_async),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """Tag usage counts for the current user, most used first."""
+    counts = await note_service.tag_counts(db, owner_id=current_user.clerk_id, limit=limit)
+    return [TagCount(tag=tag, count=count) for tag, count in counts]
+
+@router.get("/calendar", response_model=List[CalendarDay])
+async def notes_calendar(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    current_user: User = Depends(deps.get_current_user_async),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """
+    Per-day note counts by category for target dates between `from` and `to`
+    (inclusive, YYYY-MM-DD). Days without notes are omitted.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (end - start).days > 366:
+        raise HTTPException(status_code=400, detail="Date range is limited to one year")
+    return await note_service.calendar(db, owner_id=current_user.clerk_id, start=start, end=end)
+
+@router.get("/export")
+async def export_notes(
+    format: Literal["ndjson", "markdown"] = "ndjson",
+    current_user: User = Depends(deps.get_current_user_async)
+) -> StreamingResponse:
+    """
+    Download every note of the current user, as NDJSON (one note per line)
+    or a zip of Markdown files. Streamed in chunks straight off a DB cursor.
     """
-    
+    if format == "ndjson":
+        body = export_service.ndjson(current_user.clerk_id)
+        media_type = "application/x-ndjson"
+    else:
+        body = export_service.markdown_zip(current_user.clerk_id)
+        media_type = "application/zip"
+
+    filename = export_service.filename(format)
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+async def read_input_text(text: Optional[str], audio: Optional[UploadFile]) -> str:
+    """Typed text plus the audio transcript, if any."""
     if not text and not audio:
         raise HTTPException(status_code=400, detail="Either text or audio must be provided")
 
     input_text = text or ""
 
-    # 1. Handle Audio
     if audio:
         contents = await audio.read()
-        transcribed_text = voice_service.transcribe(contents)
+        # Whisper client is blocking, keep it off the event loop
+        transcribed_text = await run_in_threadpool(voice_service.transcribe, contents)
         if transcribed_text:
             input_text += f"\n{transcribed_text}" if input_text else transcribed_text
 
     if not input_text:
         raise HTTPException(status_code=400, detail="Could not extract text from input")
+    return input_text
+
+def find_duplicate(owner_id: str, input_text: str) -> Optional[ProcessedNote]:
+    """Earlier result for a near-duplicate input, per DEDUP_MODE."""
+    if settings.DEDUP_MODE == "off":
+        return None
+    match = dedup_index.find(owner_id, input_text)
+    if not match:
+        return None
+    if settings.DEDUP_MODE == "reject":
+        raise HTTPException(status_code=409, detail=f"Duplicate of a recent note: {match.result.title}")
+    return match.result
+
+def to_db_note(processed_note: ProcessedNote, owner_id: str) -> Note:
+    # We store the *result*, not just raw input
+    return Note(
+        title=processed_note.title,
+        content=processed_note.formatted_content,
+        status=processed_note.status,
+        category=processed_note.category,
+        target_date=processed_note.target_date,
+        tags=processed_note.tags,
+        owner_id=owner_id
+    )
+
+@router.post("/process", response_model=ProcessedNote)
+async def process_note(
+    text: Optional[str] = Form(None),
+    audio: Optional[UploadFile] = File(None),
+    mode: Optional[Literal["quality", "fast"]] = Form(None),
+    current_user: User = Depends(deps.get_current_user_async),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """
+    Process text or audio input. 
+    1. Transcribe audio if present.
+    2. Process text with LLM.
+    3. Sync to Notion.
+    4. Save to local DB.
+    """
+    # 1. Handle Audio
+    input_text = await read_input_text(text, audio)
+
+    # Near-duplicate of something this user just sent? (voice retries etc.)
+    duplicate = find_duplicate(current_user.clerk_id, input_text)
+    if duplicate:
+        return duplicate
 
     # 2. LLM Processing
-    llm_service = LLMService()
+    llm_service = get_llm_service()
     try:
-        processed_note = llm_service.process_text(input_text)
+        processed_note = await llm_service.process_text_async(input_text, mode=mode, user_id=current_user.clerk_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM Processing failed: {str(e)}")
 
     # 3. Save to Notion
     try:
-        children = markdown_to_notion_blocks(processed_note.formatted_content)
-        
-        # Determine Notion logic
-        page_title = ""
-        is_append = False
-        
-        if processed_note.category == "Note":
-             page_title = f"Daily Note - {processed_note.target_date}"
-             existing_page = await notion_service.find_page_by_title(page_title)
-             if existing_page:
-                 await notion_service.append_blocks(existing_page["id"], children)
-                 is_append = True
-             else:
-                 await notion_service.add_note(processed_note.properties, children)
-                 
-        elif processed_note.category == "Task":
-             page_title = f"Tasks - {processed_note.target_date}"
-             existing_page = await notion_service.find_page_by_title(page_title)
-             if existing_page:
-                 await notion_service.append_blocks(existing_page["id"], children)
-                 is_append = True
-             else:
-                 # Create container page properties
-                 props = processed_note.properties.copy()
-                 props["Name"] = {"title": [{"text": {"content": page_title}}]}
-                 await notion_service.add_note(props, children)
-
-        else: # Idea
-             await notion_service.add_note(processed_note.properties, children)
-
+        await notion_service.save_processed_note(processed_note)
     except Exception as e:
         # Log error but maybe don't fail request? Or ensure atomicity?
         # For now, simplistic approach
         raise HTTPException(status_code=502, detail=f"Notion Sync failed: {str(e)}")
 
     # 4. Save to Local DB (for history)
-    # We store the *result*, not just raw input
-    db_note = Note(
-        title=processed_note.title,
-        content=processed_note.formatted_content,
-        status=processed_note.status,
-        category=processed_note.category,
-        target_date=processed_note.target_date,
-        tags=processed_note.tags,
-        owner_id=current_user.clerk_id
-    )
-    db.add(db_note)
-    db.commit()
-    db.refresh(db_note)
+    # Per-request commit, or batched with other requests (NOTE_WRITE_MODE)
+    await note_writer.write(to_db_note(processed_note, current_user.clerk_id), db)
+
+    if settings.DEDUP_MODE != "off":
+        dedup_index.add(current_user.clerk_id, input_text, processed_note)
 
     return processed_note
+
+@router.post("/process/batch", response_model=NoteBatchResponse)
+async def process_note_batch(
+    request: NoteBatchRequest,
+    current_user: User = Depends(deps.get_current_user_async),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """
+    Process many texts in one call (imports, pasted lists).
+    LLM calls run concurrently (BATCH_LLM_CONCURRENCY), Notion writes are
+    grouped per daily page, and all resulting notes are inserted in one
+    transaction. One item failing doesn't fail the rest; see `items`.
+    """
+    if len(request.texts) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_ITEMS} texts per batch")
+    owner_id = current_user.clerk_id
+    items = [NoteBatchItem(index=i, ok=False) for i in range(len(request.texts))]
+
+    # Blank inputs and near-duplicates never reach the LLM; with dedup on,
+    # a repeat of an earlier text in this batch counts as a duplicate too
+    to_process = []
+    first_seen: dict[str, NoteBatchItem] = {}
+    repeats = []
+    for item, text in zip(items, request.texts):
+        key = normalize_input(text)
+        if not text.strip():
+            item.error = "Empty text"
+        elif settings.DEDUP_MODE == "reject" and key in first_seen:
+            item.error = f"Duplicate of text {first_seen[key].index} in this batch"
+        elif settings.DEDUP_MODE == "reuse" and key in first_seen:
+            repeats.append((item, first_seen[key]))
+        elif settings.DEDUP_MODE != "off" and (match := dedup_index.find(owner_id, text)):
+            if settings.DEDUP_MODE == "reject":
+                item.error = f"Duplicate of a recent note: {match.result.title}"
+            else:
+                item.ok, item.note = True, match.result
+        else:
+            to_process.append(item)
+            first_seen.setdefault(key, item)
+
+    results = await get_llm_service().process_batch_async(
+        [request.texts[item.index] for item in to_process], mode=request.mode, user_id=owner_id
+    )
+    processed_items = []
+    for item, result in zip(to_process, results):
+        if isinstance(result, Exception):
+            item.error = f"LLM Processing failed: {str(result)}"
+        else:
+            item.note = result
+            processed_items.append(item)
+
+    page_ids = await notion_service.save_processed_notes(
+        [item.note for item in processed_items], concurrency=settings.BATCH_NOTION_CONCURRENCY
+    )
+    saved_items = []
+    for item, page_id in zip(processed_items, page_ids):
+        if isinstance(page_id, Exception):
+            item.error = f"Notion Sync failed: {str(page_id)}"
+        else:
+            item.ok, item.page_id = True, page_id
+            saved_items.append(item)
+
+    # One transaction for the whole batch
+    await note_writer.write_many([to_db_note(item.note, owner_id) for item in saved_items], db)
+    if settings.DEDUP_MODE != "off":
+        for item in saved_items:
+            dedup_index.add(owner_id, request.texts[item.index], item.note)
+    # Reused repeats share the earlier item's outcome, written once
+    for item, original in repeats:
+        item.ok, item.page_id, item.error = original.ok, original.page_id, original.error
+        item.note = original.note.model_copy(deep=True) if original.note else None
+
+    succeeded = sum(item.ok for item in items)
+    return NoteBatchResponse(items=items, succeeded=succeeded, failed=len(items) - succeeded)
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+STAGE_FIELDS = {
+    "formatter": ("category", "title", "target_date", "formatted_content", "tags"),
+    "enricher": ("status", "tags", "properties"),
+}
+
+@router.post("/process/stream")
+async def process_note_stream(
+    text: Optional[str] = Form(None),
+    audio: Optional[UploadFile] = File(None),
+    mode: Optional[Literal["quality", "fast"]] = Form(None),
+    current_user: User = Depends(deps.get_current_user_async)
+) -> StreamingResponse:
+    """
+    Same pipeline as /process, reported as Server-Sent Events while it runs:
+    `transcript`, `fields` (formatter output as it streams), `formatter`,
+    `enricher`, `notion` (page id), then `done` with the full ProcessedNote,
+    or `error` with a status code and detail.
+    """
+    if not text and not audio:
+        raise HTTPException(status_code=400, detail="Either text or audio must be provided")
+    # Read the upload now, it's closed once the response starts streaming
+    audio_bytes = await audio.read() if audio else None
+    owner_id = current_user.clerk_id
+
+    async def events():
+        try:
+            input_text = text or ""
+            if audio_bytes:
+                transcribed_text = await run_in_threadpool(voice_service.transcribe, audio_bytes)
+                if transcribed_text:
+                    input_text += f"\n{transcribed_text}" if input_text else transcribed_text
+            if not input_text:
+                raise HTTPException(status_code=400, detail="Could not extract text from input")
+            yield sse_event("transcript", {"text": input_text})
+
+            duplicate = find_duplicate(owner_id, input_text)
+            if duplicate:
+                yield sse_event("done", duplicate.model_dump())
+                return
+
+            processed_note = None
+            try:
+                async for stage, state in get_llm_service().stream_text(input_text, mode=mode, user_id=owner_id):
+                    if stage == "result":
+                        processed_note = state
+                    elif stage == "fields":
+                        yield sse_event("fields", state)
+                    else:
+                        fields = STAGE_FIELDS.get(stage, ())
+                        yield sse_event(stage, {k: state.get(k) for k in fields})
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"LLM Processing failed: {str(e)}")
+
+            try:
+                page_id = await notion_service.save_processed_note(processed_note)
+            except Exception as e:
+                raise HTTPException(status_code=502, detail=f"Notion Sync failed: {str(e)}")
+            yield sse_event("notion", {"page_id": page_id})
+
+            await note_writer.write(to_db_note(processed_note, owner_id))
+            if settings.DEDUP_MODE != "off":
+                dedup_index.add(owner_id, input_text, processed_note)
+            yield sse_event("done", processed_note.model_dump())
+        except HTTPException as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -14,17 +14,77 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./data/app.db"
 
+    # SQLite storage profile, applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL" # WAL lets readers proceed during commits
+    SQLITE_SYNCHRONOUS: str = "NORMAL" # Safe with WAL, one fsync per checkpoint
+    SQLITE_MMAP_SIZE: int = 268435456 # 256 MiB of memory-mapped I/O
+    SQLITE_CACHE_SIZE: int = -65536 # Negative = KiB, i.e. 64 MiB page cache
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000 # Wait for the write lock instead of failing
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+
+    # Note write path: "sync" (commit per request), "group" (batched commit,
+    # request waits for it) or "async" (write-behind, request doesn't wait)
+    NOTE_WRITE_MODE: str = "sync"
+    NOTE_BATCH_INTERVAL_MS: int = 20
+    NOTE_BATCH_MAX_ROWS: int = 200
+    CALENDAR_CACHE_SIZE: int = 1024 # Users whose calendar aggregates are cached (0 disables)
+    CALENDAR_CACHE_TTL_SECONDS: int = 60 # Bounds staleness from other workers' writes
+    CALENDAR_CACHE_RANGES_PER_USER: int = 8 # Distinct (from, to) ranges kept per user
+
+    USER_CACHE_TTL_SECONDS: int = 300 # clerk_id -> User lookups served from memory
+    USER_CACHE_MAX_SIZE: int = 10000
+
     # Authentication (Clerk)
     CLERK_SECRET_KEY: str
     CLERK_PUBLISHABLE_KEY: str
     CLERK_ISSUER: str = "" # Optional, usually specific to instance
+    CLERK_JWKS_TTL_SECONDS: int = 3600 # How long a fetched key set is considered fresh
+    CLERK_JWKS_REFRESH_MARGIN_SECONDS: int = 300 # Background refresh this long before expiry
+    TOKEN_CACHE_MAX_SIZE: int = 1024 # Verified JWT payloads kept in memory (0 disables)
 
     # AI Models
     OPENAI_API_KEY: str | None = None
     GOOGLE_API_KEY: str | None = None
     
-    # Optional: Open Source Model Endpoint
-    OLLAMA_BASE_URL: str = "http://localhost:11434/v1"
+    # "quality" = formatter + enricher LLM calls, "fast" = one combined call
+    LLM_PIPELINE_MODE: str = "quality"
+    # Quality-mode enricher: "rules" (local, no LLM call) or "llm"
+    LLM_ENRICHER: str = "rules"
+    # Exact-match cache of processed notes (0 size disables)
+    LLM_CACHE_TTL_SECONDS: int = 900
+    LLM_CACHE_MAX_SIZE: int = 1024
+    # Local rule pre-classifier ("remind me to", "- [ ]", "idea:"); on a hit
+    # the LLM is told the category instead of asked for it
+    PRECLASSIFIER_ENABLED: bool = True
+    # Inputs over this many (estimated) tokens are formatted in chunks, in
+    # parallel, and merged into one note
+    LLM_CHUNK_MAX_TOKENS: int = 2000
+    LLM_CHUNK_CONCURRENCY: int = 4
+    # Structured log line per pipeline node and provider call (totals are
+    # kept and served at /metrics either way)
+    LLM_METRICS_LOG: bool = True
+    # /notes/process/batch: max texts per call, LLM calls in flight per batch,
+    # concurrent Notion page writes per batch
+    BATCH_MAX_ITEMS: int = 100
+    BATCH_LLM_CONCURRENCY: int = 8
+    BATCH_NOTION_CONCURRENCY: int = 3
+    # Near-duplicate inputs: "off", "reuse" (return the earlier result,
+    # skip LLM + Notion) or "reject" (409)
+    DEDUP_MODE: str = "off"
+    DEDUP_THRESHOLD: float = 0.9 # Estimated Jaccard over character 5-grams; same date and numbers also required
+    DEDUP_WINDOW_HOURS: int = 6
+    DEDUP_MAX_ENTRIES_PER_USER: int = 200
+    
+    # Optional: Open Source Model Endpoint, e.g. http://localhost:11434/v1
+    # (unset = no Ollama backend)
+    OLLAMA_BASE_URL: str | None = None
+
+    # Route calls across every configured provider by health/latency
+    LLM_ROUTER_ENABLED: bool = True
+    LLM_ROUTER_FAILURE_THRESHOLD: int = 3 # Consecutive failures that open a provider's circuit
+    LLM_ROUTER_OPEN_SECONDS: int = 30 # How long an open circuit skips the provider
 
     model_config = SettingsConfigDict(
         env_file=".env", 
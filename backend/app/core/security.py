@@ -1,26 +1,216 @@
 
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import httpx
 import jwt
-from jwt import PyJWKClient
+from jwt import PyJWKSet
 from fastapi import Depends, HTTPException, Security, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
 
 # Clerk JWKS URL
-CLERK_JWKS_URL = f"https://api.clerk.dev/v1/jwks" 
-# Or from publishable key -> domain? 
+CLERK_JWKS_URL = f"https://api.clerk.dev/v1/jwks"
+# Or from publishable key -> domain?
 # Usually https://<instance>.clerk.accounts.dev/.well-known/jwks.json
 # BUT for simplicity, if user has instance domain, use it.
 # Settings approach: CLERK_ISSUER should be configured.
 
 security = HTTPBearer()
 
+
+class JWKSKeyStore:
+    """
+    Process-wide cache of Clerk signing keys, indexed by `kid`.
+
+    Keys are loaded once at startup and refreshed by a background task
+    shortly before they go stale. Request handlers only ever read from the
+    in-memory dict; the JWKS endpoint is hit on the request path only when a
+    token carries a `kid` we have never seen (key rotation), and even then at
+    most once per `min_refetch_interval`. If Clerk is unreachable the last
+    good key set keeps being served.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl: int = 3600,
+        refresh_margin: int = 300,
+        min_refetch_interval: int = 30,
+        timeout: float = 5.0,
+    ):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+
+        self._keys: dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at >= self.ttl
+
+    def _load(self, jwks: dict):
+        key_set = PyJWKSet.from_dict(jwks)
+        self._keys = {k.key_id: k for k in key_set.keys if k.key_id}
+        self._fetched_at = time.monotonic()
+
+    def refresh(self):
+        """Blocking fetch. Only used off the event loop (threadpool deps)."""
+        self._last_attempt = time.monotonic()
+        response = httpx.get(self.jwks_url, timeout=self.timeout)
+        response.raise_for_status()
+        self._load(response.json())
+
+    async def refresh_async(self):
+        self._last_attempt = time.monotonic()
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(self.jwks_url)
+            response.raise_for_status()
+        self._load(response.json())
+
+    def get_signing_key(self, kid: str):
+        key = self._keys.get(kid)
+        # Without a running refresher, fall back to lazy refresh on expiry
+        needs_fetch = key is None or (self._refresh_task is None and self.is_stale)
+        if needs_fetch:
+            with self._lock:
+                key = self._keys.get(kid)
+                recently_tried = time.monotonic() - self._last_attempt < self.min_refetch_interval
+                if (key is None or self.is_stale) and not recently_tried:
+                    try:
+                        self.refresh()
+                    except Exception:
+                        # Keep serving the last known key set
+                        pass
+                    key = self._keys.get(kid)
+        if key is None:
+            raise jwt.PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+        return key
+
+    def get_signing_key_from_jwt(self, token: str):
+        header = jwt.get_unverified_header(token)
+        return self.get_signing_key(header.get("kid"))
+
+    async def _refresh_loop(self):
+        while True:
+            age = time.monotonic() - self._fetched_at
+            delay = max(self.ttl - self.refresh_margin - age, self.min_refetch_interval)
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh_async()
+            except Exception:
+                # Retry after min_refetch_interval, stale keys stay in use
+                pass
+
+    async def start(self):
+        """Warm the key set and start the background refresher."""
+        try:
+            await self.refresh_async()
+        except Exception:
+            pass
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already-verified JWT payloads.
+
+    Keyed by a SHA-256 of the raw token so bearer strings are never held in
+    memory, and each entry lives only until the token's own `exp`.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if not exp or self.max_size <= 0:
+            # No expiry means we cannot bound its lifetime, don't cache
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (float(exp), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+jwks_store = JWKSKeyStore(
+    settings.CLERK_ISSUER + "/.well-known/jwks.json",
+    ttl=settings.CLERK_JWKS_TTL_SECONDS,
+    refresh_margin=settings.CLERK_JWKS_REFRESH_MARGIN_SECONDS,
+)
+token_cache = VerifiedTokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
     token = credentials.credentials
+    # Same bearer is resent until expiry, skip RS256 for tokens we already checked
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
-        # Use PyJWKClient to fetch and cache keys
-        jwks_client = PyJWKClient(settings.CLERK_ISSUER + "/.well-known/jwks.json")
-        signing_key = jwks_client.get_signing_key_from_jwt(token)
-        
+        # Keys come from the process-wide store, no network on the hot path
+        signing_key = jwks_store.get_signing_key_from_jwt(token)
+
         payload = jwt.decode(
             token,
             signing_key.key,
@@ -28,6 +218,7 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Security(security))
             audience=None, # Clerk audience verification optional/context dependent
             issuer=settings.CLERK_ISSUER
         )
+        token_cache.put(token, payload)
         return payload
     except jwt.PyJWTError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
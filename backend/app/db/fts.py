@@ -0,0 +1,73 @@
+
+"""
+SQLite FTS5 index over Note.title / Note.content.
+
+`note_fts` is an external-content FTS5 table: it stores only the inverted
+index and reads text back from `note`, kept in sync by triggers so every
+write path (ORM, bulk inserts, raw SQL) is covered.
+
+Rebuild for rows written before the index existed:
+    python -m app.db.fts rebuild
+"""
+
+import sys
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS note_fts USING fts5(
+        title, content,
+        content='note', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS note_fts_ai AFTER INSERT ON note BEGIN
+        INSERT INTO note_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS note_fts_ad AFTER DELETE ON note BEGIN
+        INSERT INTO note_fts(note_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS note_fts_au AFTER UPDATE OF title, content ON note BEGIN
+        INSERT INTO note_fts(note_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO note_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+def create_fts_index(engine: Engine) -> bool:
+    """Create the FTS table and sync triggers. Returns True if newly created."""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='note_fts'")
+        ).first()
+        for ddl in FTS_DDL:
+            conn.execute(text(ddl))
+    return not exists
+
+def rebuild_fts_index(engine: Engine):
+    """Re-index every row of `note` from scratch."""
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO note_fts(note_fts) VALUES ('rebuild')"))
+
+def build_match_query(q: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word is quoted (so user
+    input can't inject FTS syntax) and the last one is a prefix match to
+    support search-as-you-type. Words are ANDed.
+    """
+    words = [w.replace('"', '""') for w in q.split() if w.strip('"')]
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("usage: python -m app.db.fts rebuild")
+        sys.exit(1)
+    create_fts_index(engine)
+    rebuild_fts_index(engine)
+    print("note_fts rebuilt")
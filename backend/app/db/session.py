@@ -1,12 +1,92 @@
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.db.fts import create_fts_index, rebuild_fts_index
+from app.db.tags import create_tag_index, backfill_note_tags
+# Register every table on SQLModel.metadata before create_all
+from app.models import note, user  # noqa: F401
 
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
+# Sync -> async driver for the request path
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme:
+        # Already names a driver
+        return url
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+def get_sqlite_pragmas() -> dict:
+    """Storage profile from settings, as PRAGMA name -> value."""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "foreign_keys": "ON",
+    }
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: dict):
+    """Run `pragmas` on every new DBAPI connection of a SQLite engine."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def get_engine_kwargs(url: str) -> dict:
+    kwargs = {}
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if ":memory:" in url or url.rstrip("/").endswith(":"):
+            # In-memory DBs keep the SQLAlchemy default single-connection pool
+            return kwargs
+    kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return kwargs
+
+engine = create_engine(settings.DATABASE_URL, **get_engine_kwargs(settings.DATABASE_URL))
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    **get_engine_kwargs(settings.DATABASE_URL),
+)
+apply_sqlite_pragmas(engine, get_sqlite_pragmas())
+apply_sqlite_pragmas(async_engine.sync_engine, get_sqlite_pragmas())
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    # create_all skips indexes on tables that already exist, add any new ones
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    # Full-text index; backfill existing rows the first time it's created
+    if create_fts_index(engine):
+        rebuild_fts_index(engine)
+    # Normalized tags; same first-run backfill
+    if create_tag_index(engine):
+        backfill_note_tags(engine)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    # expire_on_commit=False so returned models stay readable after commit
+    # without an implicit (blocking-looking) refresh
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,67 @@
+
+"""
+Normalized tag index: one `note_tags` row per (note, tag).
+
+`Note.tags` stays the source of truth (a JSON list); triggers expand it into
+`note_tags` on every insert/update/delete so tag filters and per-user counts
+are plain index lookups instead of deserializing every row.
+
+Backfill rows written before the index existed:
+    python -m app.db.tags backfill
+"""
+
+import sys
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+EXPAND_TAGS = """
+    INSERT OR IGNORE INTO note_tags(note_id, tag, owner_id)
+    SELECT new.id, json_each.value, new.owner_id FROM json_each(new.tags)
+    WHERE json_each.type = 'text';
+"""
+
+TAG_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS note_tags_ai AFTER INSERT ON note BEGIN
+        {EXPAND_TAGS}
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS note_tags_ad AFTER DELETE ON note BEGIN
+        DELETE FROM note_tags WHERE note_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS note_tags_au AFTER UPDATE OF tags, owner_id ON note BEGIN
+        DELETE FROM note_tags WHERE note_id = old.id;
+        {EXPAND_TAGS}
+    END""",
+]
+
+def create_tag_index(engine: Engine) -> bool:
+    """Create the sync triggers. Returns True if newly created."""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='note_tags_ai'")
+        ).first()
+        for ddl in TAG_DDL:
+            conn.execute(text(ddl))
+    return not exists
+
+def backfill_note_tags(engine: Engine):
+    """Rebuild `note_tags` from the JSON column of every note."""
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM note_tags"))
+        conn.execute(text("""
+            INSERT OR IGNORE INTO note_tags(note_id, tag, owner_id)
+            SELECT note.id, json_each.value, note.owner_id
+            FROM note, json_each(note.tags)
+            WHERE json_each.type = 'text'
+        """))
+
+if __name__ == "__main__":
+    from app.db.session import engine, create_db_and_tables
+
+    if len(sys.argv) < 2 or sys.argv[1] != "backfill":
+        print("usage: python -m app.db.tags backfill")
+        sys.exit(1)
+    create_db_and_tables()
+    backfill_note_tags(engine)
+    print("note_tags backfilled")
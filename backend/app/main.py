@@ -4,14 +4,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.db.session import create_db_and_tables
+from app.db.session import create_db_and_tables, async_engine
+from app.core.security import jwks_store
+from app.services.note_writer import note_writer
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Create DB tables
     create_db_and_tables()
+    # Warm Clerk signing keys and keep them refreshed in the background
+    await jwks_store.start()
+    await note_writer.start()
     yield
     # Shutdown logic if any
+    await note_writer.stop() # Flush buffered notes before the engine goes away
+    await jwks_store.stop()
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME, 
@@ -1,6 +1,7 @@
 
 from typing import Optional, List
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, JSON
 
 class NoteBase(SQLModel):
@@ -12,10 +13,28 @@ class NoteBase(SQLModel):
     tags: List[str] = Field(default=[], sa_type=JSON) 
 
 class Note(NoteBase, table=True):
+    __table_args__ = (
+        # Backs keyset pagination of a user's history (newest first)
+        Index("ix_note_owner_created_id", "owner_id", "created_at", "id"),
+        # Backs calendar ranges; category makes the grouped count index-only
+        Index("ix_note_owner_target_date", "owner_id", "target_date", "category"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     owner_id: str = Field(index=True) # Clerk User ID
 
+class NoteTag(SQLModel, table=True):
+    """One row per (note, tag), maintained from Note.tags by app.db.tags."""
+    __tablename__ = "note_tags"
+    __table_args__ = (
+        Index("ix_note_tags_owner_tag", "owner_id", "tag"),
+    )
+
+    note_id: int = Field(foreign_key="note.id", primary_key=True)
+    tag: str = Field(primary_key=True)
+    owner_id: str
+
 class NoteCreate(NoteBase):
     pass
 
@@ -1,6 +1,6 @@
 
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 class NoteProcessRequest(BaseModel):
@@ -18,6 +18,23 @@ class NoteResponse(BaseModel):
     created_at: datetime
     owner_id: str
 
+class NotePage(BaseModel):
+    items: List[NoteResponse]
+    next_cursor: Optional[str] = None
+
+class NoteSearchHit(NoteResponse):
+    snippet: str
+    rank: float
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class CalendarDay(BaseModel):
+    date: str # YYYY-MM-DD
+    total: int
+    categories: Dict[str, int]
+
 class ProcessedNote(BaseModel):
     category: str
     title: str
@@ -26,3 +43,19 @@ class ProcessedNote(BaseModel):
     status: str
     target_date: str
     tags: List[str]
+
+class NoteBatchRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1)
+    mode: Optional[Literal["quality", "fast"]] = None
+
+class NoteBatchItem(BaseModel):
+    index: int
+    ok: bool
+    note: Optional[ProcessedNote] = None
+    page_id: Optional[str] = None
+    error: Optional[str] = None
+
+class NoteBatchResponse(BaseModel):
+    items: List[NoteBatchItem]
+    succeeded: int
+    failed: int
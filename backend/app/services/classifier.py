@@ -0,0 +1,69 @@
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
+CATEGORIES = ("Note", "Idea", "Task")
+
+LABELS_PATH = Path(__file__).resolve().parents[2] / "data" / "classifier_labels.jsonl"
+
+# (category, pattern) checked in order; a hit is treated as certain
+RULES = [
+    ("Task", re.compile(r"^\s*- \[[ x]\]", re.IGNORECASE | re.MULTILINE)),
+    ("Task", re.compile(r"^\s*(todo|to-do|task)\s*:", re.IGNORECASE)),
+    ("Task", re.compile(r"^\s*(remind me to|don'?t forget to|remember to)\b", re.IGNORECASE)),
+    ("Idea", re.compile(r"^\s*((app|startup|business|product|feature|blog post|side project)\s+)?(idea|concept)\s*:", re.IGNORECASE)),
+    ("Idea", re.compile(r"^\s*what if\b", re.IGNORECASE)),
+    ("Note", re.compile(r"^\s*(note|notes|meeting notes|meeting quick notes|standup notes|summary)\s*:", re.IGNORECASE)),
+]
+
+def classify(text: str) -> Optional[str]:
+    """
+    Category of an obviously classifiable input ("remind me to", "- [ ]",
+    "idea:"), or None to leave it to the LLM. Anchored rules only, so a
+    hit is reliable; microseconds per call.
+    """
+    for category, pattern in RULES:
+        if pattern.search(text):
+            return category
+    return None
+
+def load_examples(path: Path = LABELS_PATH) -> list[tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["text"], row["category"]) for row in rows]
+
+def _agreement(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return "n/a"
+    agree = sum(a == b for a, b in pairs)
+    return f"{agree}/{len(pairs)} ({agree / len(pairs):.0%})"
+
+def evaluate(examples: list[tuple[str, str]], with_llm: bool = False):
+    """Prints rule coverage and agreement with the labels (and optionally the LLM)."""
+    llm = None
+    if with_llm:
+        from app.services.llm_service import LLMService
+        llm = LLMService(preclassify=False)
+
+    rows = []
+    for text, label in examples:
+        llm_category = llm.process_text(text).category if llm else None
+        rows.append((classify(text), label, llm_category))
+
+    hits = [r for r in rows if r[0] is not None]
+    print(f"examples: {len(rows)}, decided by rules: {len(hits)} ({len(hits) / len(rows):.0%})")
+    print(f"rules vs labels: {_agreement([(c, l) for c, l, _ in hits])}")
+    if llm:
+        print(f"rules vs LLM:    {_agreement([(c, m) for c, _, m in hits])}")
+        print(f"LLM vs labels:   {_agreement([(m, l) for _, l, m in rows])}")
+
+if __name__ == "__main__":
+    # python -m app.services.classifier [--llm]
+    parser = argparse.ArgumentParser(description="Evaluate the local note pre-classifier")
+    parser.add_argument("--labels", type=Path, default=LABELS_PATH)
+    parser.add_argument("--llm", action="store_true", help="also compare against the configured LLM")
+    args = parser.parse_args()
+    evaluate(load_examples(args.labels), with_llm=args.llm)
@@ -0,0 +1,219 @@
+
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Optional
+from app.core.config import settings
+from app.schemas.note import ProcessedNote
+from app.utils.date_tools import resolve_target_date
+
+_MASK64 = (1 << 64) - 1
+_NON_WORD = re.compile(r"[^\w\s]")
+_NUMBER = re.compile(r"\d+")
+
+@dataclass
+class _Entry:
+    entry_id: int
+    created_at: float
+    target_date: Optional[str]
+    numbers: tuple
+    signature: tuple
+    sketch: tuple
+    result: ProcessedNote
+
+@dataclass
+class DuplicateMatch:
+    similarity: float
+    created_at: float
+    result: ProcessedNote
+
+class _UserIndex:
+    def __init__(self):
+        self.entries: deque[_Entry] = deque()
+        self.buckets: dict[tuple, set[int]] = {}
+        self.by_id: dict[int, _Entry] = {}
+
+class NearDuplicateIndex:
+    """
+    Per-user MinHash/LSH index of recently processed inputs.
+
+    Inputs are normalized and shingled into character 5-grams, so a few
+    words changed by the speech-to-text still leave most shingles intact.
+    Signatures use one-permutation MinHash (one hash per shingle, min per
+    bin, empty bins densified from their neighbour), which keeps a lookup
+    well under a millisecond, and LSH banding over them finds candidates.
+    Densified bins make that estimate too noisy near the threshold, so
+    candidates are confirmed on a bottom-k sketch (the `sketch_size`
+    smallest shingle hashes), which is exact for inputs of up to about
+    `sketch_size` characters.
+
+    Memory is bounded by `max_entries` per user and `max_users` (LRU), and
+    entries older than `window_seconds` are dropped on access.
+
+    A one-word change ("Friday" -> "Monday", "3pm" -> "4pm") can keep most
+    shingles, so a match also needs the same resolved target date and the
+    same numbers. Entries keep only those, the signature and the sketch,
+    not the text.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        threshold: float = 0.9,
+        window_seconds: int = 6 * 3600,
+        max_entries: int = 200,
+        max_users: int = 10000,
+        shingle_size: int = 5,
+        sketch_size: int = 128,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.max_users = max_users
+        self.shingle_size = shingle_size
+        self.sketch_size = sketch_size
+        self._users: OrderedDict[str, _UserIndex] = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def _shingles(self, text: str) -> set[str]:
+        text = unicodedata.normalize("NFKC", text).casefold()
+        text = " ".join(_NON_WORD.sub(" ", text).split())
+        k = self.shingle_size
+        if len(text) <= k:
+            return {text}
+        return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+    def _hashes(self, text: str) -> set[int]:
+        return {hash(shingle) & _MASK64 for shingle in self._shingles(text)}
+
+    def signature(self, hashes: set[int]) -> tuple:
+        k = self.num_perm
+        bins = [_MASK64] * k
+        for h in hashes:
+            b = h % k
+            v = h // k
+            if v < bins[b]:
+                bins[b] = v
+        # Rotation densification: empty bins borrow the next filled bin
+        if _MASK64 in bins and any(v != _MASK64 for v in bins):
+            filled = bins[:]
+            for i in range(k):
+                j = i
+                while filled[j % k] == _MASK64:
+                    j += 1
+                bins[i] = filled[j % k]
+        return tuple(bins)
+
+    def _band_keys(self, signature: tuple):
+        r = self.rows
+        return [(band, signature[band * r:(band + 1) * r]) for band in range(self.bands)]
+
+    def sketch(self, hashes: set[int]) -> tuple:
+        return tuple(heapq.nsmallest(self.sketch_size, hashes))
+
+    def similarity(self, a: tuple, b: tuple) -> float:
+        """Jaccard estimate from two sketches: the share of the union's bottom-k found in both."""
+        both = set(a) & set(b)
+        union = heapq.nsmallest(self.sketch_size, set(a) | set(b))
+        return sum(h in both for h in union) / len(union) if union else 1.0
+
+    def _expire(self, index: _UserIndex, now: float):
+        cutoff = now - self.window_seconds
+        while index.entries and (index.entries[0].created_at < cutoff or len(index.entries) > self.max_entries):
+            self._remove(index, index.entries.popleft())
+
+    def _remove(self, index: _UserIndex, entry: _Entry):
+        index.by_id.pop(entry.entry_id, None)
+        for key in self._band_keys(entry.signature):
+            bucket = index.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry.entry_id)
+                if not bucket:
+                    del index.buckets[key]
+
+    @staticmethod
+    def _numbers(text: str) -> tuple:
+        # Times, amounts, quantities
+        return tuple(sorted(_NUMBER.findall(text)))
+
+    def find(self, user_id: str, text: str) -> Optional[DuplicateMatch]:
+        """
+        Best near-duplicate of `text` this user submitted in the window.
+        Inputs whose date can't be resolved locally never match.
+        """
+        target_date = resolve_target_date(text)
+        if target_date is None:
+            return None
+        numbers = self._numbers(text)
+        hashes = self._hashes(text)
+        signature, sketch = self.signature(hashes), self.sketch(hashes)
+        now = time.time()
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                return None
+            self._users.move_to_end(user_id)
+            self._expire(index, now)
+
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates |= index.buckets.get(key, set())
+
+            best = None
+            for entry_id in candidates:
+                entry = index.by_id[entry_id]
+                if entry.target_date != target_date or entry.numbers != numbers:
+                    continue
+                score = self.similarity(sketch, entry.sketch)
+                if score >= self.threshold and (best is None or score > best.similarity):
+                    best = DuplicateMatch(score, entry.created_at, entry.result)
+        if best is not None:
+            best.result = best.result.model_copy(deep=True)
+        return best
+
+    def add(self, user_id: str, text: str, result: ProcessedNote):
+        # Resolved now, so "tomorrow" sent before and after midnight differ
+        target_date = resolve_target_date(text)
+        numbers = self._numbers(text)
+        hashes = self._hashes(text)
+        signature, sketch = self.signature(hashes), self.sketch(hashes)
+        now = time.time()
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                index = self._users[user_id] = _UserIndex()
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            self._users.move_to_end(user_id)
+
+            self._next_id += 1
+            entry = _Entry(self._next_id, now, target_date, numbers, signature, sketch, result.model_copy(deep=True))
+            index.entries.append(entry)
+            index.by_id[entry.entry_id] = entry
+            for key in self._band_keys(signature):
+                index.buckets.setdefault(key, set()).add(entry.entry_id)
+            self._expire(index, now)
+
+    def clear(self, user_id: Optional[str] = None):
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+dedup_index = NearDuplicateIndex(
+    threshold=settings.DEDUP_THRESHOLD,
+    window_seconds=settings.DEDUP_WINDOW_HOURS * 3600,
+    max_entries=settings.DEDUP_MAX_ENTRIES_PER_USER,
+)
@@ -0,0 +1,71 @@
+
+import json
+import re
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator
+from app.models.note import Note
+from app.schemas.note import NoteResponse
+from app.services.note_service import note_service
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink for zipfile; drained after every entry."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class ExportService:
+    """Streams a user's note history out without materializing it."""
+
+    def note_filename(self, note: Note) -> str:
+        day = note.target_date or note.created_at.strftime("%Y-%m-%d")
+        slug = re.sub(r"[^a-z0-9]+", "-", note.title.lower()).strip("-")[:60] or "note"
+        return f"{day}-{slug}-{note.id}.md"
+
+    def note_to_markdown(self, note: Note) -> str:
+        front_matter = {
+            "title": note.title,
+            "category": note.category,
+            "status": note.status,
+            "target_date": note.target_date,
+            "tags": note.tags,
+            "created_at": note.created_at.isoformat(),
+        }
+        # JSON scalars are valid YAML, so values come out quoted and safe
+        header = "\n".join(f"{k}: {json.dumps(v, ensure_ascii=False)}" for k, v in front_matter.items())
+        return f"---\n{header}\n---\n\n# {note.title}\n\n{note.content}\n"
+
+    async def ndjson(self, owner_id: str) -> AsyncIterator[bytes]:
+        async for note in note_service.iter_notes(owner_id):
+            yield NoteResponse.model_validate(note, from_attributes=True).model_dump_json().encode() + b"\n"
+
+    async def markdown_zip(self, owner_id: str) -> AsyncIterator[bytes]:
+        buffer = _ChunkBuffer()
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            async for note in note_service.iter_notes(owner_id):
+                info = zipfile.ZipInfo(self.note_filename(note), date_time=note.created_at.timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, self.note_to_markdown(note))
+                chunk = buffer.drain()
+                if chunk:
+                    yield chunk
+        # Central directory
+        yield buffer.drain()
+
+    def filename(self, fmt: str) -> str:
+        stamp = datetime.utcnow().strftime("%Y%m%d")
+        return f"notes-{stamp}.ndjson" if fmt == "ndjson" else f"notes-{stamp}.zip"
+
+export_service = ExportService()
@@ -0,0 +1,52 @@
+
+"""
+Process-wide registry of LangChain chat model clients.
+
+Building a chat model sets up a fresh HTTP client (and TLS session) for the
+provider, so callers should never construct one per request. Clients are
+keyed by provider, model and connection settings, created on first use and
+then shared by `LLMService` and the Streamlit `agent.NoteAgent`.
+
+Kept free of app settings so the Streamlit path can import it without the
+FastAPI configuration.
+"""
+
+import hashlib
+import threading
+from typing import Optional
+
+_clients: dict[tuple, object] = {}
+_lock = threading.Lock()
+
+def _build(provider: str, model: str, temperature: float, api_key: Optional[str], base_url: Optional[str]):
+    if provider == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=model, temperature=temperature, google_api_key=api_key)
+    if provider in ("openai", "ollama"):
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model=model, temperature=temperature, api_key=api_key, base_url=base_url)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+def get_chat_model(
+    provider: str,
+    model: str,
+    temperature: float = 0.1,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+):
+    """Shared chat model for this configuration, built on first use."""
+    key_id = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    key = (provider, model, temperature, base_url, key_id)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _build(provider, model, temperature, api_key, base_url)
+                _clients[key] = client
+    return client
+
+def clear_chat_models():
+    """Drop every cached client (tests, key rotation)."""
+    with _lock:
+        _clients.clear()
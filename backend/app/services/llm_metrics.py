@@ -0,0 +1,205 @@
+
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+from app.core.config import settings
+from app.utils.chunking import estimate_tokens
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# USD per 1M tokens (prompt, completion); unknown models are costed at 0
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "llama3": (0.0, 0.0),
+}
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+def _message_text(message: Any) -> str:
+    content = getattr(message, "content", message)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return str(content)
+
+def _usage(messages: list, response: Any, completion_text: str) -> tuple[int, int, bool]:
+    """(prompt, completion, estimated) tokens; provider counts when reported."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("input_tokens") is not None:
+        return usage["input_tokens"], usage.get("output_tokens", 0), False
+    prompt = sum(estimate_tokens(_message_text(m)) for m in messages)
+    return prompt, estimate_tokens(completion_text), True
+
+class _Series:
+    """Counters plus a window of recent durations for percentiles."""
+
+    def __init__(self, window: int = 500):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_calls = 0
+        self.cost_usd = 0.0
+        self.recent: deque[float] = deque(maxlen=window)
+
+    def snapshot(self, tokens: bool = True) -> dict:
+        ordered = sorted(self.recent)
+
+        def percentile(p: float) -> Optional[float]:
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else None
+
+        snapshot = {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_seconds": self.seconds / self.count if self.count else None,
+            "p50_seconds": percentile(0.50),
+            "p95_seconds": percentile(0.95),
+        }
+        if tokens:
+            snapshot.update({
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "estimated_calls": self.estimated_calls,
+                "cost_usd": round(self.cost_usd, 6),
+            })
+        return snapshot
+
+class PipelineMetrics:
+    """
+    In-process totals for the note pipeline: wall time per graph node, and
+    wall time, tokens and estimated cost per provider call. Every record is
+    also written as a structured log line (`pipeline_node` / `llm_call`).
+    """
+
+    def __init__(self, log: bool = True):
+        self.log = log
+        self._nodes: dict[str, _Series] = {}
+        self._calls: dict[str, _Series] = {}
+        self._lock = threading.Lock()
+
+    def record_node(self, node: str, mode: str, seconds: float, ok: bool):
+        with self._lock:
+            series = self._nodes.setdefault(f"{mode}.{node}", _Series())
+            series.count += 1
+            series.errors += not ok
+            series.seconds += seconds
+            series.recent.append(seconds)
+        if self.log:
+            logger.info("pipeline_node", node=node, mode=mode, seconds=round(seconds, 4), ok=ok)
+
+    def record_call(
+        self,
+        provider: str,
+        model: str,
+        seconds: float,
+        ok: bool,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        estimated: bool = False,
+    ):
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            series = self._calls.setdefault(f"{provider}:{model}", _Series())
+            series.count += 1
+            series.errors += not ok
+            series.seconds += seconds
+            series.recent.append(seconds)
+            series.prompt_tokens += prompt_tokens
+            series.completion_tokens += completion_tokens
+            series.estimated_calls += estimated
+            series.cost_usd += cost
+        if self.log:
+            logger.info(
+                "llm_call",
+                provider=provider,
+                model=model,
+                seconds=round(seconds, 4),
+                ok=ok,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                tokens_estimated=estimated,
+                cost_usd=round(cost, 6),
+            )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            nodes = {name: s.snapshot(tokens=False) for name, s in self._nodes.items()}
+            calls = {name: s.snapshot() for name, s in self._calls.items()}
+        return {
+            "nodes": nodes,
+            "providers": calls,
+            "total_cost_usd": round(sum(c["cost_usd"] for c in calls.values()), 6),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._nodes.clear()
+            self._calls.clear()
+
+class InstrumentedModel:
+    """
+    Wraps a chat model (`invoke` / `ainvoke` / `astream`) and records each
+    call's wall time and token usage in `metrics`. Token counts come from
+    the provider's usage metadata, or are estimated from text when the
+    provider doesn't report them (e.g. streamed replies).
+    """
+
+    def __init__(self, provider: str, model_name: str, model: Any, metrics: PipelineMetrics):
+        self.provider = provider
+        self.model_name = model_name
+        self.model = model
+        self.metrics = metrics
+
+    def _record(self, messages: list, started: float, response: Any = None, text: str = "", ok: bool = True):
+        seconds = time.perf_counter() - started
+        if not ok:
+            self.metrics.record_call(self.provider, self.model_name, seconds, False)
+            return
+        prompt, completion, estimated = _usage(messages, response, text)
+        self.metrics.record_call(self.provider, self.model_name, seconds, True, prompt, completion, estimated)
+
+    def invoke(self, messages, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.model.invoke(messages, **kwargs)
+        except Exception:
+            self._record(messages, started, ok=False)
+            raise
+        self._record(messages, started, response, _message_text(response))
+        return response
+
+    async def ainvoke(self, messages, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.model.ainvoke(messages, **kwargs)
+        except Exception:
+            self._record(messages, started, ok=False)
+            raise
+        self._record(messages, started, response, _message_text(response))
+        return response
+
+    async def astream(self, messages, **kwargs):
+        started = time.perf_counter()
+        text, last = "", None
+        try:
+            async for chunk in self.model.astream(messages, **kwargs):
+                text += _message_text(chunk)
+                # Providers that report usage on streams put it on a chunk
+                if getattr(chunk, "usage_metadata", None):
+                    last = chunk
+                yield chunk
+        except Exception:
+            self._record(messages, started, ok=False)
+            raise
+        self._record(messages, started, last, text)
+
+llm_metrics = PipelineMetrics(log=settings.LLM_METRICS_LOG)
@@ -0,0 +1,183 @@
+
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class ProviderHealth:
+    """
+    Rolling health of one LLM backend: EWMA latency of successful calls,
+    error rate over the last `window` calls, and a circuit breaker that
+    opens after `failure_threshold` consecutive failures, stays open for
+    `open_seconds`, then lets a single probe call through (half-open).
+    """
+
+    def __init__(self, window: int = 20, failure_threshold: int = 3, open_seconds: float = 30.0, alpha: float = 0.2):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.alpha = alpha
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.calls = 0
+        self.failures = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def available(self, now: float) -> bool:
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == OPEN:
+            return False
+        if self.state == HALF_OPEN:
+            return not self.probe_in_flight
+        return True
+
+    def score(self) -> float:
+        """
+        Lower is better. Untried backends score 0 so they get explored;
+        backends that have only ever failed score worst, so they are tried
+        after every backend that has worked.
+        """
+        if self.latency is None:
+            return float("inf") if self.failures else 0.0
+        return self.latency * (1 + 4 * self.error_rate)
+
+    def record(self, ok: bool, latency: float, now: float):
+        self.calls += 1
+        self.outcomes.append(ok)
+        self.probe_in_flight = False
+        if ok:
+            self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = now
+
+class LLMRouter:
+    """
+    Drop-in for a chat model (`invoke` / `ainvoke` / `astream`) that spreads calls over
+    several configured backends.
+
+    Each call goes to the healthiest backend whose circuit is not open
+    (lowest latency, penalized by recent error rate; configuration order
+    breaks ties) and falls through to the next one if it raises. If every
+    circuit is open the one that has been open longest is tried anyway rather
+    than failing outright.
+    """
+
+    def __init__(self, providers: list[tuple[str, Any]], **health_kwargs):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.providers = providers
+        self.health = {name: ProviderHealth(**health_kwargs) for name, _ in providers}
+        self._lock = threading.Lock()
+
+    def _candidates(self) -> list[tuple[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            order = {name: i for i, (name, _) in enumerate(self.providers)}
+            ready = [(n, m) for n, m in self.providers if self.health[n].available(now)]
+            ready.sort(key=lambda p: (self.health[p[0]].score(), order[p[0]]))
+            if not ready:
+                ready = sorted(self.providers, key=lambda p: self.health[p[0]].opened_at)[:1]
+            return ready
+
+    def _acquire(self, name: str) -> bool:
+        """Claim the call slot; a half-open backend admits one probe at a time."""
+        with self._lock:
+            health = self.health[name]
+            if health.state == HALF_OPEN:
+                if health.probe_in_flight:
+                    return False
+                health.probe_in_flight = True
+            return True
+
+    def _record(self, name: str, ok: bool, started: float):
+        now = time.monotonic()
+        with self._lock:
+            self.health[name].record(ok, now - started, now)
+
+    def invoke(self, messages, **kwargs):
+        last_error = None
+        for name, model in self._candidates():
+            if not self._acquire(name):
+                continue
+            started = time.monotonic()
+            try:
+                response = model.invoke(messages, **kwargs)
+            except Exception as e:
+                self._record(name, False, started)
+                last_error = e
+                continue
+            self._record(name, True, started)
+            return response
+        raise last_error or RuntimeError("No LLM provider available")
+
+    async def ainvoke(self, messages, **kwargs):
+        last_error = None
+        for name, model in self._candidates():
+            if not self._acquire(name):
+                continue
+            started = time.monotonic()
+            try:
+                response = await model.ainvoke(messages, **kwargs)
+            except Exception as e:
+                self._record(name, False, started)
+                last_error = e
+                continue
+            self._record(name, True, started)
+            return response
+        raise last_error or RuntimeError("No LLM provider available")
+
+    async def astream(self, messages, **kwargs):
+        """
+        Streams from the chosen backend. Failover only happens before the
+        first chunk; once output has been yielded, errors propagate.
+        """
+        last_error = None
+        for name, model in self._candidates():
+            if not self._acquire(name):
+                continue
+            started = time.monotonic()
+            started_output = False
+            try:
+                async for chunk in model.astream(messages, **kwargs):
+                    started_output = True
+                    yield chunk
+            except Exception as e:
+                self._record(name, False, started)
+                if started_output:
+                    raise
+                last_error = e
+                continue
+            self._record(name, True, started)
+            return
+        raise last_error or RuntimeError("No LLM provider available")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    "state": h.state,
+                    "latency_ewma": h.latency,
+                    "error_rate": h.error_rate,
+                    "calls": h.calls,
+                    "failures": h.failures,
+                }
+                for name, h in self.health.items()
+            }
@@ -1,15 +1,27 @@
 
+import asyncio
+import inspect
 import os
-import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypedDict, Any
 from datetime import datetime
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
 from app.core.config import settings
-from app.utils.date_tools import get_current_context
+from app.utils.chunking import split_text
+from app.utils.date_tools import get_current_context, get_context_date, resolve_target_date
+from app.utils.enrichment import DEFAULT_STATUS, MAX_TAGS, enrich
+from app.utils.json_extract import JSONStreamParser, extract_json
 from app.schemas.note import ProcessedNote
+from app.services.classifier import classify
+from app.services.llm_clients import get_chat_model
+from app.services.llm_metrics import InstrumentedModel, llm_metrics
+from app.services.llm_router import LLMRouter
+from app.services.result_cache import ResultCache
 
 class NoteState(TypedDict):
     input_text: str
@@ -20,99 +32,285 @@ class NoteState(TypedDict):
     status: str
     target_date: str
     tags: list[str]
+    category_hint: str | None
     error: str | None
 
+PIPELINE_MODES = ("quality", "fast")
+
+ENRICHERS = ("rules", "llm")
+
 class LLMService:
-    def __init__(self):
+    def __init__(self, mode: str | None = None, enricher: str | None = None, preclassify: bool | None = None):
         self.llm = self._get_llm()
-        self.graph = self._create_graph()
+        # "quality": formatter + enricher (2 calls), "fast": one combined call
+        self.mode = mode or settings.LLM_PIPELINE_MODE
+        # "rules": local status/tags, "llm": second LLM call (opt-in)
+        self.enricher = enricher or settings.LLM_ENRICHER
+        if self.enricher not in ENRICHERS:
+            raise ValueError(f"Unknown enricher: {self.enricher}")
+        # Rule-classified inputs are passed to the LLM with their category as a given
+        self.preclassify = settings.PRECLASSIFIER_ENABLED if preclassify is None else preclassify
+        self.graphs = {}
+        self.graph = self.get_graph(self.mode)
+        # Resubmissions of the same text on the same day skip the LLM
+        self.cache = ResultCache(ttl=settings.LLM_CACHE_TTL_SECONDS, max_size=settings.LLM_CACHE_MAX_SIZE)
 
-    def _get_llm(self):
-        # 1. Try Google Gemini
+    def _get_providers(self) -> list:
+        # Clients come from the process-wide registry, so HTTP/TLS connections
+        # to the provider are reused across requests. Each is wrapped so every
+        # call's latency, tokens and cost land in `llm_metrics`.
+        providers = []
+        # 1. Google Gemini
         if settings.GOOGLE_API_KEY:
             try:
-                return ChatGoogleGenerativeAI(
-                    model="gemini-1.5-flash",
+                providers.append(("gemini", InstrumentedModel("gemini", "gemini-1.5-flash", get_chat_model(
+                    "google",
+                    "gemini-1.5-flash",
                     temperature=0.1,
-                    google_api_key=settings.GOOGLE_API_KEY
-                )
+                    api_key=settings.GOOGLE_API_KEY
+                ), llm_metrics)))
             except Exception:
                 pass
         
-        # 2. Try OpenAI
+        # 2. OpenAI
         if settings.OPENAI_API_KEY:
-             return ChatOpenAI(
-                model="gpt-4o-mini",
+             providers.append(("openai", InstrumentedModel("openai", "gpt-4o-mini", get_chat_model(
+                "openai",
+                "gpt-4o-mini",
                 temperature=0.1,
                 api_key=settings.OPENAI_API_KEY
-            )
+            ), llm_metrics)))
 
-        # 3. Try Local/Custom Endpoint (Ollama/Compatible)
+        # 3. Local/Custom Endpoint (Ollama/Compatible)
         if settings.OLLAMA_BASE_URL: # e.g. http://localhost:11434/v1
-             return ChatOpenAI(
-                base_url=settings.OLLAMA_BASE_URL,
+             providers.append(("ollama", InstrumentedModel("ollama", "llama3", get_chat_model(
+                "ollama",
+                "llama3", # default or config
+                temperature=0.1,
                 api_key="ollama", # placeholder
-                model="llama3", # default or config
-                temperature=0.1
+                base_url=settings.OLLAMA_BASE_URL
+            ), llm_metrics)))
+        return providers
+
+    def _get_llm(self):
+        providers = self._get_providers()
+        if not providers:
+            raise ValueError(
+                "No LLM provider configured: set GOOGLE_API_KEY, OPENAI_API_KEY or OLLAMA_BASE_URL "
+                "(e.g. http://localhost:11434/v1; local Ollama is no longer used unless OLLAMA_BASE_URL is set)"
             )
-            
-        raise ValueError("No LLM provider configured (Gemini/OpenAI/Ollama)")
 
-    def _content_formatter_node(self, state: NoteState) -> NoteState:
-        date_context = get_current_context()
-        system_prompt = f"""You are a smart assistant for classifying notes and extracting dates.
-{date_context}
+        if not settings.LLM_ROUTER_ENABLED or len(providers) == 1:
+            # First configured provider, as before
+            return providers[0][1]
 
-Your Tasks:
-1. Classify input as: "Note", "Idea", or "Task"
-2. Extract/Generate a short Title.
-3. **EXTRACT TARGET DATE (Crucial):**
+        # Route each call to the healthiest backend, with circuit breakers
+        return LLMRouter(
+            providers,
+            failure_threshold=settings.LLM_ROUTER_FAILURE_THRESHOLD,
+            open_seconds=settings.LLM_ROUTER_OPEN_SECONDS,
+        )
+
+    @staticmethod
+    def _parse_json(content: str) -> dict:
+        # Tolerates fences, surrounding prose and truncated replies
+        return extract_json(content)
+
+    @staticmethod
+    def _build_properties(title: str, target_date: str, status: str, tags: list[str]) -> dict:
+        return {
+            "Name": {"title": [{"text": {"content": title}}]},
+            "Date": {"date": {"start": target_date}},
+            "Status": {"select": {"name": status}},
+            "Tags": {"multi_select": [{"name": tag} for tag in tags[:MAX_TAGS]]}
+        }
+
+    def _system_prompt(self, state: NoteState, with_status: bool = False) -> str:
+        """
+        Formatter instructions. With a confident pre-classification the
+        category is stated rather than asked for, and only that category's
+        formatting rule is sent. A target date resolved locally drops the
+        date context and extraction step altogether.
+        """
+        hint = state.get("category_hint")
+        resolved_date = state.get("target_date")
+        steps = []
+        dates = "" if resolved_date else " and extracting dates"
+        if hint:
+            intro = f"You are a smart assistant for formatting a {hint}{dates}."
+        else:
+            intro = f"You are a smart assistant for classifying notes{dates}."
+            steps.append('Classify input as: "Note", "Idea", or "Task"')
+        steps.append("Extract/Generate a short Title.")
+        if not resolved_date:
+            steps.append("""**EXTRACT TARGET DATE (Crucial):**
    - Format: YYYY-MM-DD
-   - Default: Today's date.
-4. **FORMAT CONTENT (Crucial):**
-   - **IF TASK:** Format as CHECKLIST `- [ ]`. Remove time words like "tomorrow". Start with Verb.
-   - **IF NOTE/IDEA:** Standard Markdown.
-5. Extract tags.
+   - Default: Today's date.""")
+        task_rule = '**IF TASK:** Format as CHECKLIST `- [ ]`. Remove time words like "tomorrow". Start with Verb.'
+        note_rule = "**IF NOTE/IDEA:** Standard Markdown."
+        if hint == "Task":
+            rules = task_rule.replace("**IF TASK:** ", "")
+            steps.append(f"**FORMAT CONTENT (Crucial):** {rules}")
+        elif hint:
+            steps.append("**FORMAT CONTENT (Crucial):** Standard Markdown.")
+        else:
+            steps.append(f"""**FORMAT CONTENT (Crucial):**
+   - {task_rule}
+   - {note_rule}""")
+        steps.append("Extract tags.")
+        if with_status and not hint:
+            steps.append('Pick a status: Task -> "To Do", Idea -> "Draft", Note -> "Active".')
+
+        fields = []
+        if not hint:
+            fields.append('"category": "Note|Idea|Task"')
+        fields.append('"title": "Title"')
+        if not resolved_date:
+            fields.append('"target_date": "YYYY-MM-DD"')
+        fields.append('"formatted_content": "Markdown..."')
+        if with_status and not hint:
+            fields.append('"status": "Active|To Do|Draft"')
+        fields.append('"tags": ["tag1"]')
+
+        numbered = "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+        output = ",\n    ".join(fields)
+        date_context = "" if resolved_date else f"\n{get_current_context()}"
+        return f"""{intro}{date_context}
+
+Your Tasks:
+{numbered}
 
 Output JSON only:
 {{
-    "category": "Note|Idea|Task",
-    "title": "Title",
-    "target_date": "YYYY-MM-DD",
-    "formatted_content": "Markdown...",
-    "tags": ["tag1"]
+    {output}
 }}"""
-        
+
+    def _formatter_messages(self, state: NoteState) -> list:
+        return [
+            SystemMessage(content=self._system_prompt(state)),
+            HumanMessage(content=f"Input: {state['input_text']}")
+        ]
+
+    def _apply_formatter(self, state: NoteState, content: str) -> NoteState:
+        result = self._parse_json(content)
+        state.update({
+            "category": state.get("category_hint") or result["category"],
+            "title": result["title"],
+            "formatted_content": result["formatted_content"],
+            "target_date": state.get("target_date") or result.get("target_date", datetime.now().strftime("%Y-%m-%d")),
+            "tags": result.get("tags", []),
+            "error": None
+        })
+        return state
+
+    def _chunk_states(self, state: NoteState) -> list[NoteState]:
+        """One state per chunk of a long input; short inputs give [state]."""
+        chunks = split_text(state["input_text"], settings.LLM_CHUNK_MAX_TOKENS)
+        if len(chunks) == 1:
+            return [state]
+        return [{**state, "input_text": chunk} for chunk in chunks]
+
+    def _merge_chunks(self, state: NoteState, parts: list[NoteState]) -> NoteState:
+        """
+        Reduce step for a chunked input: the majority category (earlier
+        chunks break ties), the first chunk's title and date, contents in
+        order, tags unioned.
+        """
+        categories = [part["category"] for part in parts]
+        category = state.get("category_hint") or max(categories, key=lambda c: (categories.count(c), -categories.index(c)))
+        title = parts[0]["title"]
+        target_date = state.get("target_date") or parts[0]["target_date"]
+        # Fast mode parts tag themselves with their own category; keep only the winner
+        tags = [
+            tag for tag in dict.fromkeys(tag for part in parts for tag in part["tags"])
+            if tag not in categories or tag == category
+        ]
+        state.update({
+            "category": category,
+            "title": title,
+            "formatted_content": "\n\n".join(part["formatted_content"] for part in parts),
+            "target_date": target_date,
+            "tags": tags,
+            "error": None
+        })
+        if any(part.get("status") for part in parts):
+            # Fast mode parts already carry status and properties
+            status = next(
+                (part["status"] for part in parts if part["category"] == category and part.get("status")),
+                DEFAULT_STATUS.get(category, "Active"),
+            )
+            state["status"] = status
+            state["properties"] = self._build_properties(title, target_date, status, tags)
+        return state
+
+    def _map_chunks(self, state: NoteState, messages_fn, apply_fn) -> NoteState:
+        """One LLM call for short inputs; long ones are formatted chunk by chunk in parallel, then merged."""
+        parts = self._chunk_states(state)
+        if len(parts) == 1:
+            return apply_fn(state, self.llm.invoke(messages_fn(state)).content)
+
+        with ThreadPoolExecutor(max_workers=settings.LLM_CHUNK_CONCURRENCY) as pool:
+            replies = list(pool.map(lambda part: self.llm.invoke(messages_fn(part)).content, parts))
+        for part, reply in zip(parts, replies):
+            apply_fn(part, reply)
+        return self._merge_chunks(state, parts)
+
+    async def _amap_chunks(self, state: NoteState, messages_fn, apply_fn, config: RunnableConfig | None = None) -> NoteState:
+        parts = self._chunk_states(state)
+        if len(parts) == 1:
+            return apply_fn(state, await self._areply(messages_fn(state), config, state))
+
+        semaphore = asyncio.Semaphore(settings.LLM_CHUNK_CONCURRENCY)
+
+        async def reply(part: NoteState) -> str:
+            async with semaphore:
+                return (await self.llm.ainvoke(messages_fn(part))).content
+
+        replies = await asyncio.gather(*(reply(part) for part in parts))
+        for part, content in zip(parts, replies):
+            apply_fn(part, content)
+        return self._merge_chunks(state, parts)
+
+    def _content_formatter_node(self, state: NoteState) -> NoteState:
         try:
-            response = self.llm.invoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Input: {state['input_text']}")
-            ])
-            
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif content.startswith("```"):
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(content)
-            
-            state.update({
-                "category": result["category"],
-                "title": result["title"],
-                "formatted_content": result["formatted_content"],
-                "target_date": result.get("target_date", datetime.now().strftime("%Y-%m-%d")),
-                "tags": result.get("tags", []),
-                "error": None
-            })
+            self._map_chunks(state, self._formatter_messages, self._apply_formatter)
         except Exception as e:
             state["error"] = f"Formatter error: {str(e)}"
         
         return state
 
-    def _property_creator_node(self, state: NoteState) -> NoteState:
-        if state.get("error"): return state
-        
+    async def _areply(self, messages: list, config: RunnableConfig | None = None, state: NoteState | None = None) -> str:
+        """
+        Reply text of an async LLM call. Under `stream_text` the reply is
+        streamed and each top-level JSON field is pushed to the graph's
+        custom stream as soon as it is complete, with the locally decided
+        category and target date from `state` taking precedence, as they
+        do in the final note.
+        """
+        if not (config or {}).get("configurable", {}).get("stream_fields"):
+            return (await self.llm.ainvoke(messages)).content
+        overrides = {}
+        if state and state.get("category_hint"):
+            overrides["category"] = state["category_hint"]
+        if state and state.get("target_date"):
+            overrides["target_date"] = state["target_date"]
+        writer = get_stream_writer()
+        parser = JSONStreamParser()
+        async for chunk in self.llm.astream(messages):
+            fields = parser.feed(chunk.content if isinstance(chunk.content, str) else "")
+            if fields:
+                writer({**fields, **{k: v for k, v in overrides.items() if k in fields}})
+        return parser.buffer
+
+    async def _acontent_formatter_node(self, state: NoteState, config: RunnableConfig) -> NoteState:
+        try:
+            await self._amap_chunks(state, self._formatter_messages, self._apply_formatter, config)
+        except Exception as e:
+            state["error"] = f"Formatter error: {str(e)}"
+
+        return state
+
+    def _property_messages(self, state: NoteState) -> list:
         system_prompt = """Generate Notion-compatible status and tags.
 Return JSON only: {"status": "Active|To Do|Draft", "additional_tags": []}"""
         
@@ -120,53 +318,168 @@ Return JSON only: {"status": "Active|To Do|Draft", "additional_tags": []}"""
 Title: {state['title']}
 Target Date: {state['target_date']}
 Tags: {state['tags']}"""
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+
+    def _apply_properties(self, state: NoteState, content: str) -> NoteState:
+        result = self._parse_json(content)
+        
+        # Category first so the Notion tag cap never drops it
+        all_tags = list(dict.fromkeys([state["category"]] + state["tags"] + result.get("additional_tags", [])))
+        
+        state["properties"] = self._build_properties(
+            state["title"], state["target_date"], result.get("status", "Active"), all_tags
+        )
+        state["status"] = result.get("status", "Active")
+        state["tags"] = all_tags
+        return state
+
+    def _fallback_properties(self, state: NoteState) -> NoteState:
+        state["properties"] = {
+            "Name": {"title": [{"text": {"content": state["title"]}}]},
+            "Date": {"date": {"start": state["target_date"]}},
+            "Status": {"select": {"name": "Active"}},
+            "Tags": {"multi_select": [{"name": t} for t in state["tags"]]}
+        }
+        state["status"] = "Active"
+        return state
+
+    def _property_creator_node(self, state: NoteState) -> NoteState:
+        if state.get("error"): return state
 
         try:
-            response = self.llm.invoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ])
-            
-            content = response.content.strip()
-            if "```" in content:
-                content = content.split("```")[1].replace("json", "").strip()
-            
-            result = json.loads(content)
-            
-            all_tags = list(set(state["tags"] + result.get("additional_tags", []) + [state["category"]]))
-            
-            state["properties"] = {
-                "Name": {"title": [{"text": {"content": state["title"]}}]},
-                "Date": {"date": {"start": state["target_date"]}},
-                "Status": {"select": {"name": result.get("status", "Active")}},
-                "Tags": {"multi_select": [{"name": tag} for tag in all_tags[:5]]}
-            }
-            state["status"] = result.get("status", "Active")
-            state["tags"] = all_tags
-            
+            response = self.llm.invoke(self._property_messages(state))
+            self._apply_properties(state, response.content)
+        except Exception as e:
+            self._fallback_properties(state)
+
+        return state
+
+    async def _aproperty_creator_node(self, state: NoteState) -> NoteState:
+        if state.get("error"): return state
+
+        try:
+            response = await self.llm.ainvoke(self._property_messages(state))
+            self._apply_properties(state, response.content)
+        except Exception as e:
+            self._fallback_properties(state)
+
+        return state
+
+    def _rule_enricher_node(self, state: NoteState) -> NoteState:
+        """Status and extra tags from local rules, no LLM call."""
+        if state.get("error"): return state
+
+        status, all_tags = enrich(
+            state["category"], state["title"], state["formatted_content"], state["tags"], state["input_text"]
+        )
+        state["properties"] = self._build_properties(state["title"], state["target_date"], status, all_tags)
+        state["status"] = status
+        state["tags"] = all_tags
+        return state
+
+    async def _arule_enricher_node(self, state: NoteState) -> NoteState:
+        # Pure CPU and quick, no need for a worker thread
+        return self._rule_enricher_node(state)
+
+    def _single_call_messages(self, state: NoteState) -> list:
+        return [
+            SystemMessage(content=self._system_prompt(state, with_status=True)),
+            HumanMessage(content=f"Input: {state['input_text']}")
+        ]
+
+    def _apply_single_call(self, state: NoteState, content: str) -> NoteState:
+        result = self._parse_json(content)
+        category = state.get("category_hint") or result["category"]
+
+        target_date = state.get("target_date") or result.get("target_date", datetime.now().strftime("%Y-%m-%d"))
+        status = result.get("status") or DEFAULT_STATUS.get(category, "Active")
+        all_tags = list(dict.fromkeys([category] + result.get("tags", [])))
+        state.update({
+            "category": category,
+            "title": result["title"],
+            "formatted_content": result["formatted_content"],
+            "target_date": target_date,
+            "status": status,
+            "tags": all_tags,
+            "properties": self._build_properties(result["title"], target_date, status, all_tags),
+            "error": None
+        })
+        return state
+
+    def _single_call_node(self, state: NoteState) -> NoteState:
+        """Fast mode: formatter and enricher folded into one LLM call."""
+        try:
+            self._map_chunks(state, self._single_call_messages, self._apply_single_call)
+        except Exception as e:
+            state["error"] = f"Formatter error: {str(e)}"
+
+        return state
+
+    async def _asingle_call_node(self, state: NoteState, config: RunnableConfig) -> NoteState:
+        try:
+            await self._amap_chunks(state, self._single_call_messages, self._apply_single_call, config)
         except Exception as e:
-             # Fallback
-            state["properties"] = {
-                "Name": {"title": [{"text": {"content": state["title"]}}]},
-                "Date": {"date": {"start": state["target_date"]}},
-                "Status": {"select": {"name": "Active"}},
-                "Tags": {"multi_select": [{"name": t} for t in state["tags"]]}
-            }
-            state["status"] = "Active"
+            state["error"] = f"Formatter error: {str(e)}"
 
         return state
 
-    def _create_graph(self):
+    def _node(self, mode: str, name: str, func, afunc) -> RunnableLambda:
+        """Graph node from a sync/async body pair, timed into `llm_metrics`."""
+        takes_config = "config" in inspect.signature(afunc).parameters
+
+        def timed(state: NoteState) -> NoteState:
+            started = time.perf_counter()
+            result = func(state)
+            llm_metrics.record_node(name, mode, time.perf_counter() - started, not result.get("error"))
+            return result
+
+        async def atimed(state: NoteState, config: RunnableConfig) -> NoteState:
+            started = time.perf_counter()
+            if takes_config:
+                result = await afunc(state, config)
+            else:
+                result = await afunc(state)
+            llm_metrics.record_node(name, mode, time.perf_counter() - started, not result.get("error"))
+            return result
+
+        return RunnableLambda(timed, afunc=atimed, name=name)
+
+    def _create_graph(self, mode: str = "quality"):
+        # Each node has a sync and an async body: graph.invoke runs the former,
+        # graph.ainvoke the latter, so one compiled graph serves both paths
         workflow = StateGraph(NoteState)
-        workflow.add_node("formatter", self._content_formatter_node)
-        workflow.add_node("enricher", self._property_creator_node)
-        workflow.set_entry_point("formatter")
-        workflow.add_edge("formatter", "enricher")
-        workflow.add_edge("enricher", END)
+        if mode == "fast":
+            workflow.add_node("formatter", self._node(mode, "formatter", self._single_call_node, self._asingle_call_node))
+            workflow.set_entry_point("formatter")
+            workflow.add_edge("formatter", END)
+        else:
+            workflow.add_node("formatter", self._node(mode, "formatter", self._content_formatter_node, self._acontent_formatter_node))
+            if self.enricher == "llm":
+                enricher = self._node(mode, "enricher", self._property_creator_node, self._aproperty_creator_node)
+            else:
+                enricher = self._node(mode, "enricher", self._rule_enricher_node, self._arule_enricher_node)
+            workflow.add_node("enricher", enricher)
+            workflow.set_entry_point("formatter")
+            workflow.add_edge("formatter", "enricher")
+            workflow.add_edge("enricher", END)
         return workflow.compile()
 
-    def process_text(self, text: str) -> ProcessedNote:
-        initial_state = {
+    def get_graph(self, mode: str | None = None):
+        mode = mode or self.mode
+        if mode not in PIPELINE_MODES:
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+        if mode not in self.graphs:
+            self.graphs[mode] = self._create_graph(mode)
+        return self.graphs[mode]
+
+    def _category_hint(self, text: str) -> str | None:
+        return classify(text) if self.preclassify else None
+
+    def _initial_state(self, text: str) -> NoteState:
+        return {
             "input_text": text,
             "category": "",
             "title": "",
@@ -174,12 +487,13 @@ Tags: {state['tags']}"""
             "properties": {},
             "status": "",
             "tags": [],
+            "category_hint": self._category_hint(text),
             "error": None,
-             "target_date": ""
+            # Resolved locally when unambiguous, else left to the LLM
+            "target_date": resolve_target_date(text) or ""
         }
-        
-        result = self.graph.invoke(initial_state)
-        
+
+    def _to_processed_note(self, result: NoteState) -> ProcessedNote:
         if result.get("error"):
             raise Exception(result["error"])
             
@@ -192,3 +506,123 @@ Tags: {state['tags']}"""
             target_date=result["target_date"],
             tags=result["tags"]
         )
+
+    def _cache_key(self, text: str, mode: str, user_id: str | None) -> str:
+        return self.cache.make_key(text, get_context_date(), mode, self.enricher, user_id)
+
+    def process_text(self, text: str, mode: str | None = None, user_id: str | None = None) -> ProcessedNote:
+        mode = mode or self.mode
+        cache_key = self._cache_key(text, mode, user_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = self.get_graph(mode).invoke(self._initial_state(text))
+        processed = self._to_processed_note(result)
+        self.cache.put(cache_key, processed)
+        return processed
+
+    async def process_text_async(self, text: str, mode: str | None = None, user_id: str | None = None) -> ProcessedNote:
+        """Same as `process_text`, but awaits the provider instead of blocking the loop."""
+        mode = mode or self.mode
+        cache_key = self._cache_key(text, mode, user_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = await self.get_graph(mode).ainvoke(self._initial_state(text))
+        processed = self._to_processed_note(result)
+        self.cache.put(cache_key, processed)
+        return processed
+
+    async def process_batch_async(
+        self,
+        texts: list[str],
+        mode: str | None = None,
+        user_id: str | None = None,
+        max_concurrency: int | None = None,
+    ) -> list[ProcessedNote | Exception]:
+        """
+        Many inputs through one `graph.abatch`, at most `max_concurrency`
+        in flight. Cache hits skip the graph, and texts that share a cache
+        key go through it once. Results keep the input order; a failed item
+        is returned as its exception instead of raising.
+        """
+        mode = mode or self.mode
+        keys = [self._cache_key(text, mode, user_id) for text in texts]
+        results: list[ProcessedNote | Exception | None] = [self.cache.get(key) for key in keys]
+        # First index per uncached key; the rest copy its result
+        first: dict[str, int] = {}
+        for i, result in enumerate(results):
+            if result is None:
+                first.setdefault(keys[i], i)
+        pending = list(first.values())
+        if not pending:
+            return results
+
+        states = await self.get_graph(mode).abatch(
+            [self._initial_state(texts[i]) for i in pending],
+            config={"max_concurrency": max_concurrency or settings.BATCH_LLM_CONCURRENCY},
+            return_exceptions=True,
+        )
+        for i, state in zip(pending, states):
+            try:
+                if isinstance(state, Exception):
+                    raise state
+                results[i] = self._to_processed_note(state)
+            except Exception as e:
+                results[i] = e
+                continue
+            self.cache.put(keys[i], results[i])
+        for i, result in enumerate(results):
+            if result is None:
+                source = results[first[keys[i]]]
+                results[i] = source if isinstance(source, Exception) else source.model_copy(deep=True)
+        return results
+
+    async def stream_text(self, text: str, mode: str | None = None, user_id: str | None = None):
+        """
+        Runs the graph with `astream`, yielding (node_name, state) as each
+        node finishes and finally ("result", ProcessedNote). While the
+        formatter reply is still streaming, ("fields", {...}) carries each
+        JSON field as soon as it is complete. A cache hit yields only the
+        result.
+        """
+        mode = mode or self.mode
+        cache_key = self._cache_key(text, mode, user_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield "result", cached
+            return
+
+        final = None
+        stream = self.get_graph(mode).astream(
+            self._initial_state(text),
+            stream_mode=["updates", "custom"],
+            config={"configurable": {"stream_fields": True}},
+        )
+        async for kind, update in stream:
+            if kind == "custom":
+                yield "fields", update
+                continue
+            for node, state in update.items():
+                if state.get("error"):
+                    raise Exception(state["error"])
+                final = state
+                yield node, state
+
+        processed = self._to_processed_note(final)
+        self.cache.put(cache_key, processed)
+        yield "result", processed
+
+_llm_service: LLMService | None = None
+_llm_service_lock = threading.Lock()
+
+def get_llm_service() -> LLMService:
+    """Process-wide LLMService, so the graph is compiled only once."""
+    global _llm_service
+    if _llm_service is None:
+        with _llm_service_lock:
+            if _llm_service is None:
+                _llm_service = LLMService()
+    return _llm_service
@@ -0,0 +1,231 @@
+
+import base64
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import AsyncIterator, Optional, Sequence
+from sqlalchemy import func, text, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.db.fts import build_match_query
+from app.db.session import async_engine
+from app.models.note import Note, NoteTag
+
+class NoteService:
+    """Read-side queries over a user's local note history."""
+
+    def __init__(self, calendar_cache_size: int = 1024, calendar_cache_ttl: float = 60, calendar_ranges_per_user: int = 8):
+        # owner_id -> {(from, to): (expires_at, days)}, both levels LRU. Dropped
+        # whenever the owner writes here; the TTL bounds staleness from writes
+        # made by other worker processes
+        self._calendar_cache: OrderedDict[str, OrderedDict] = OrderedDict()
+        self._calendar_cache_size = calendar_cache_size
+        self._calendar_cache_ttl = calendar_cache_ttl
+        self._calendar_ranges_per_user = calendar_ranges_per_user
+        # Write sequence: a calendar read only caches its result if the owner
+        # hasn't written since the read started. Per-owner records are LRU
+        # bounded; `_write_floor` covers owners whose record was evicted
+        self._write_seq = 0
+        self._written_at: OrderedDict[str, int] = OrderedDict()
+        self._write_floor = 0
+        self._lock = threading.Lock()
+
+    def invalidate_owner(self, owner_id: str):
+        """Forget cached aggregates after `owner_id` writes a note."""
+        with self._lock:
+            self._calendar_cache.pop(owner_id, None)
+            self._write_seq += 1
+            self._written_at[owner_id] = self._write_seq
+            self._written_at.move_to_end(owner_id)
+            while len(self._written_at) > max(self._calendar_cache_size, 1):
+                _, seq = self._written_at.popitem(last=False)
+                self._write_floor = max(self._write_floor, seq)
+
+    @staticmethod
+    def encode_cursor(note: Note) -> str:
+        raw = f"{note.created_at.isoformat()}|{note.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            created_at, note_id = raw.rsplit("|", 1)
+            return datetime.fromisoformat(created_at), int(note_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    async def list_notes(
+        self,
+        db: AsyncSession,
+        owner_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        target_date: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> tuple[Sequence[Note], Optional[str]]:
+        """
+        One page of notes, newest first.
+
+        Keyset pagination on (created_at, id) within an owner, so every page
+        is a bounded range scan of ix_note_owner_created_id no matter how deep
+        the user pages. Returns (notes, next_cursor).
+        """
+        query = select(Note).where(Note.owner_id == owner_id)
+        if category:
+            query = query.where(Note.category == category)
+        if status:
+            query = query.where(Note.status == status)
+        if target_date:
+            query = query.where(Note.target_date == target_date)
+        if tag:
+            query = query.join(NoteTag, NoteTag.note_id == Note.id).where(
+                NoteTag.owner_id == owner_id, NoteTag.tag == tag
+            )
+        if cursor:
+            created_at, note_id = self.decode_cursor(cursor)
+            query = query.where(tuple_(Note.created_at, Note.id) < tuple_(created_at, note_id))
+
+        # Fetch one extra row to know whether another page exists
+        query = query.order_by(Note.created_at.desc(), Note.id.desc()).limit(limit + 1)
+        notes = (await db.exec(query)).all()
+
+        next_cursor = None
+        if len(notes) > limit:
+            notes = notes[:limit]
+            next_cursor = self.encode_cursor(notes[-1])
+        return notes, next_cursor
+
+    async def search_notes(
+        self,
+        db: AsyncSession,
+        owner_id: str,
+        q: str,
+        limit: int = 20,
+    ) -> list[tuple[Note, str, float]]:
+        """
+        Full-text search over title and content via `note_fts`.
+        Best bm25 matches first (title weighted higher); returns
+        (note, snippet, rank) tuples.
+        """
+        match = build_match_query(q)
+        if not match:
+            return []
+
+        rows = (await db.exec(
+            text("""
+                SELECT note_fts.rowid AS id,
+                       snippet(note_fts, 1, '**', '**', '…', 12) AS snippet,
+                       bm25(note_fts, 5.0, 1.0) AS rank
+                FROM note_fts
+                JOIN note ON note.id = note_fts.rowid
+                WHERE note_fts MATCH :match AND note.owner_id = :owner_id
+                ORDER BY rank
+                LIMIT :limit
+            """),
+            params={"match": match, "owner_id": owner_id, "limit": limit},
+        )).all()
+        if not rows:
+            return []
+
+        notes = (await db.exec(select(Note).where(Note.id.in_([r.id for r in rows])))).all()
+        by_id = {n.id: n for n in notes}
+        return [(by_id[r.id], r.snippet, r.rank) for r in rows if r.id in by_id]
+
+    async def tag_counts(self, db: AsyncSession, owner_id: str, limit: int = 50) -> list[tuple[str, int]]:
+        """Most used tags for a user, served from ix_note_tags_owner_tag."""
+        count = func.count().label("count")
+        query = (
+            select(NoteTag.tag, count)
+            .where(NoteTag.owner_id == owner_id)
+            .group_by(NoteTag.tag)
+            .order_by(count.desc(), NoteTag.tag)
+            .limit(limit)
+        )
+        return list((await db.exec(query)).all())
+
+    async def calendar(
+        self,
+        db: AsyncSession,
+        owner_id: str,
+        start: date,
+        end: date,
+    ) -> list[dict]:
+        """
+        Per-day note counts by category for target dates in [start, end],
+        from one grouped query over ix_note_owner_target_date. Results are
+        cached per user until their next write or for CALENDAR_CACHE_TTL_SECONDS.
+        """
+        key = (start.isoformat(), end.isoformat())
+        if self._calendar_cache_size > 0:
+            with self._lock:
+                ranges = self._calendar_cache.get(owner_id)
+                entry = ranges.get(key) if ranges else None
+                if entry is not None:
+                    expires_at, cached = entry
+                    if time.monotonic() < expires_at:
+                        ranges.move_to_end(key)
+                        return cached
+                    del ranges[key]
+                read_seq = self._write_seq
+
+        query = (
+            select(Note.target_date, Note.category, func.count())
+            .where(
+                Note.owner_id == owner_id,
+                Note.target_date >= key[0],
+                Note.target_date <= key[1],
+            )
+            .group_by(Note.target_date, Note.category)
+            .order_by(Note.target_date)
+        )
+        days: dict[str, dict] = {}
+        for target_date, category, count in (await db.exec(query)).all():
+            day = days.setdefault(target_date, {"date": target_date, "total": 0, "categories": {}})
+            day["categories"][category] = count
+            day["total"] += count
+        result = list(days.values())
+
+        if self._calendar_cache_size > 0:
+            with self._lock:
+                if max(self._written_at.get(owner_id, 0), self._write_floor) > read_seq:
+                    # A write landed while we were reading; don't cache what may predate it
+                    return result
+                ranges = self._calendar_cache.setdefault(owner_id, OrderedDict())
+                ranges[key] = (time.monotonic() + self._calendar_cache_ttl, result)
+                ranges.move_to_end(key)
+                while len(ranges) > self._calendar_ranges_per_user:
+                    ranges.popitem(last=False)
+                self._calendar_cache.move_to_end(owner_id)
+                while len(self._calendar_cache) > self._calendar_cache_size:
+                    self._calendar_cache.popitem(last=False)
+        return result
+
+    async def iter_notes(self, owner_id: str, batch_size: int = 500) -> AsyncIterator[Note]:
+        """
+        Every note of a user, oldest first, streamed off a server-side cursor
+        `batch_size` rows at a time. Uses its own session so it can outlive
+        the request's dependencies while a streaming response is being sent.
+        """
+        query = (
+            select(Note)
+            .where(Note.owner_id == owner_id)
+            .order_by(Note.created_at, Note.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async with AsyncSession(async_engine) as db:
+            result = await db.stream_scalars(query)
+            async for note in result:
+                yield note
+                # Don't let the identity map grow with the export
+                db.expunge(note)
+
+note_service = NoteService(
+    calendar_cache_size=settings.CALENDAR_CACHE_SIZE,
+    calendar_cache_ttl=settings.CALENDAR_CACHE_TTL_SECONDS,
+    calendar_ranges_per_user=settings.CALENDAR_CACHE_RANGES_PER_USER,
+)
@@ -0,0 +1,165 @@
+
+import asyncio
+from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.db.session import async_engine
+from app.models.note import Note
+from app.services.note_service import note_service
+
+WRITE_MODES = ("sync", "group", "async")
+
+class NoteWriter:
+    """
+    Write path for Note rows, with three durability modes:
+
+    - "sync":  commit per request on the request's own session (default).
+    - "group": group commit. Requests enqueue their note and wait until the
+               batch it landed in is committed, so the note is durable when
+               the request returns but many requests share one fsync.
+    - "async": write-behind. Requests return as soon as the note is queued;
+               notes still in the buffer are lost if the process crashes.
+
+    Batches close after `interval_ms` or `max_rows`, whichever comes first,
+    and whatever is buffered is flushed by `stop()` on shutdown.
+    """
+
+    def __init__(self, mode: str = "sync", interval_ms: int = 20, max_rows: int = 200):
+        if mode not in WRITE_MODES:
+            raise ValueError(f"NOTE_WRITE_MODE must be one of {WRITE_MODES}, got {mode!r}")
+        self.mode = mode
+        self.interval = interval_ms / 1000
+        self.max_rows = max_rows
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.rows = 0
+        self.failed_rows = 0
+
+    async def start(self):
+        if self.mode == "sync" or self._task is not None:
+            return
+        # Bounded so a stalled DB pushes back on requests instead of eating RAM
+        self._queue = asyncio.Queue(maxsize=self.max_rows * 10)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything buffered and stop the background writer."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def write(self, note: Note, db: Optional[AsyncSession] = None):
+        if self._task is None:
+            if db is not None:
+                db.add(note)
+                await db.commit()
+                note_service.invalidate_owner(note.owner_id)
+            else:
+                await self._commit([note])
+            return
+
+        done = asyncio.get_running_loop().create_future() if self.mode == "group" else None
+        await self._queue.put((note, done))
+        if done is not None:
+            await done
+
+    async def write_many(self, notes: list[Note], db: Optional[AsyncSession] = None):
+        """
+        Inserts `notes` in a single transaction, whatever the mode. Batches
+        are already one commit, so they bypass the group/async queue.
+        """
+        if not notes:
+            return
+        if db is not None:
+            db.add_all(notes)
+            await db.commit()
+            for owner_id in {note.owner_id for note in notes}:
+                note_service.invalidate_owner(owner_id)
+        else:
+            await self._commit(notes)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.interval
+            while len(batch) < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # Drain anything that raced in behind the stop marker
+        rest = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                rest.append(item)
+        if rest:
+            await self._flush(rest)
+
+    async def _flush(self, batch: list):
+        notes = [note for note, _ in batch]
+        try:
+            await self._commit(notes)
+        except Exception as e:
+            if len(batch) == 1:
+                self.failed_rows += 1
+                self._settle(batch[0][1], e)
+                return
+            # One bad row fails the shared transaction; retry one by one so
+            # only its own caller sees the error
+            for item in batch:
+                await self._flush([item])
+            return
+        for _, done in batch:
+            self._settle(done)
+
+    @staticmethod
+    def _settle(done: Optional[asyncio.Future], error: Optional[Exception] = None):
+        if done is None or done.done():
+            return
+        if error is None:
+            done.set_result(None)
+        else:
+            done.set_exception(error)
+
+    async def _commit(self, notes: list[Note]):
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            db.add_all(notes)
+            await db.commit()
+        self.batches += 1
+        self.rows += len(notes)
+        for owner_id in {note.owner_id for note in notes}:
+            note_service.invalidate_owner(owner_id)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "failed_rows": self.failed_rows,
+        }
+
+note_writer = NoteWriter(
+    mode=settings.NOTE_WRITE_MODE,
+    interval_ms=settings.NOTE_BATCH_INTERVAL_MS,
+    max_rows=settings.NOTE_BATCH_MAX_ROWS,
+)
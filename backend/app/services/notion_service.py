@@ -1,8 +1,12 @@
 
+import asyncio
 import os
 import httpx
 from datetime import datetime
 from app.core.config import settings
+from app.utils.data_parsing import markdown_to_notion_blocks
+
+NOTION_MAX_BLOCKS = 100
 
 class NotionService:
     def __init__(self):
@@ -57,4 +61,137 @@ class NotionService:
                 raise Exception(f"Notion Error: {response.text}")
             return response.json()
 
+    async def save_processed_note(self, processed_note) -> str:
+        """
+        Writes a processed note to Notion and returns the page id.
+        Notes and Tasks are appended to the day's shared page
+        ("Daily Note - <date>" / "Tasks - <date>"), Ideas get their own page.
+        """
+        children = markdown_to_notion_blocks(processed_note.formatted_content)
+
+        if processed_note.category == "Note":
+            page_title = f"Daily Note - {processed_note.target_date}"
+            existing_page = await self.find_page_by_title(page_title)
+            if existing_page:
+                await self.append_blocks(existing_page["id"], children)
+                return existing_page["id"]
+            page = await self.add_note(processed_note.properties, children)
+            return page.get("id", "")
+
+        if processed_note.category == "Task":
+            page_title = f"Tasks - {processed_note.target_date}"
+            existing_page = await self.find_page_by_title(page_title)
+            if existing_page:
+                await self.append_blocks(existing_page["id"], children)
+                return existing_page["id"]
+            # Create container page properties
+            props = processed_note.properties.copy()
+            props["Name"] = {"title": [{"text": {"content": page_title}}]}
+            page = await self.add_note(props, children)
+            return page.get("id", "")
+
+        # Idea
+        page = await self.add_note(processed_note.properties, children)
+        return page.get("id", "")
+
+    async def _save_group(self, page_title: str, notes: list) -> list:
+        """
+        One shared page: looked up once, then the notes' blocks appended in
+        requests of at most 100 blocks, split at note boundaries where they
+        fit. Returns the page id or the exception per note; if a request
+        fails, notes written by earlier requests still count as saved and a
+        note cut off midway reports how much of it reached the page.
+        """
+        blocks = [markdown_to_notion_blocks(note.formatted_content) for note in notes]
+        requests, current, size = [], [], 0
+        for i, note_blocks in enumerate(blocks):
+            # A note over the limit spans several requests; an empty one still gets a slot
+            for start in range(0, max(len(note_blocks), 1), NOTION_MAX_BLOCKS):
+                part = note_blocks[start:start + NOTION_MAX_BLOCKS]
+                if current and size + len(part) > NOTION_MAX_BLOCKS:
+                    requests.append(current)
+                    current, size = [], 0
+                current.append((i, part))
+                size += len(part)
+        requests.append(current)
+
+        existing_page = await self.find_page_by_title(page_title)
+        page_id = existing_page["id"] if existing_page else None
+        written = [0] * len(notes)
+        complete = [False] * len(notes)
+        error = None
+        for request in requests:
+            children = [block for _, part in request for block in part]
+            try:
+                if page_id is None:
+                    # Same page properties as save_processed_note would create
+                    props = notes[0].properties.copy()
+                    if notes[0].category == "Task":
+                        props["Name"] = {"title": [{"text": {"content": page_title}}]}
+                    page = await self.add_note(props, children)
+                    page_id = page.get("id", "")
+                elif children:
+                    await self.append_blocks(page_id, children)
+            except Exception as e:
+                error = e
+                break
+            for i, part in request:
+                written[i] += len(part)
+                complete[i] = written[i] == len(blocks[i])
+
+        results = []
+        for i in range(len(notes)):
+            if complete[i]:
+                results.append(page_id)
+            elif written[i]:
+                results.append(Exception(
+                    f"Partially written to page {page_id} ({written[i]} of {len(blocks[i])} blocks): {error}"
+                ))
+            else:
+                results.append(error)
+        return results
+
+    async def save_processed_notes(self, processed_notes: list, concurrency: int = 3) -> list:
+        """
+        Batch version of `save_processed_note`. Notes and Tasks bound for the
+        same daily page are written with one search and as few appends as
+        the block limit allows; groups and Ideas run concurrently, at most
+        `concurrency` at a time. Returns a page id or the exception per
+        note, in input order.
+        """
+        groups: dict[str, list[int]] = {}
+        singles = []
+        for i, note in enumerate(processed_notes):
+            if note.category == "Note":
+                groups.setdefault(f"Daily Note - {note.target_date}", []).append(i)
+            elif note.category == "Task":
+                groups.setdefault(f"Tasks - {note.target_date}", []).append(i)
+            else:
+                singles.append(i)
+
+        results: list = [None] * len(processed_notes)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_group(page_title: str, indexes: list[int]):
+            async with semaphore:
+                try:
+                    saved = await self._save_group(page_title, [processed_notes[i] for i in indexes])
+                except Exception as e:
+                    saved = [e] * len(indexes)
+            for i, page_id in zip(indexes, saved):
+                results[i] = page_id
+
+        async def run_single(i: int):
+            async with semaphore:
+                try:
+                    results[i] = await self.save_processed_note(processed_notes[i])
+                except Exception as e:
+                    results[i] = e
+
+        await asyncio.gather(
+            *(run_group(title, indexes) for title, indexes in groups.items()),
+            *(run_single(i) for i in singles),
+        )
+        return results
+
 notion_service = NotionService()
@@ -0,0 +1,76 @@
+
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+from app.schemas.note import ProcessedNote
+
+def normalize_input(text: str) -> str:
+    """Canonical form for cache keys: NFC, collapsed whitespace, trimmed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+class ResultCache:
+    """
+    Bounded TTL + LRU cache of `ProcessedNote` results.
+
+    Keys are a SHA-256 over the normalized input, the date the LLM was given
+    as "today" (so "tomorrow" resolves again after midnight) and whatever
+    else changes the output (pipeline mode, enricher, owner).
+    """
+
+    def __init__(self, ttl: int = 900, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, ProcessedNote]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text: str, context_date: str, *parts: Optional[str]) -> str:
+        raw = "\x1f".join([normalize_input(text), context_date, *(p or "" for p in parts)])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[ProcessedNote]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, note = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers may mutate what they get back
+        return note.model_copy(deep=True)
+
+    def put(self, key: str, note: ProcessedNote):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, note.model_copy(deep=True))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
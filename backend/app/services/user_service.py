@@ -0,0 +1,110 @@
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.models.user import User
+
+class UserService:
+    """
+    Resolves Clerk ids to local users.
+
+    Keeps a small clerk_id -> User cache so authenticated requests don't hit
+    the DB at all once warm, and creates first-time users with a single
+    insert-or-ignore so concurrent first logins can't race each other.
+    """
+
+    def __init__(self, ttl: int = 300, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_cached(self, clerk_id: str) -> Optional[User]:
+        with self._lock:
+            entry = self._cache.get(clerk_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if time.monotonic() >= expires_at:
+                del self._cache[clerk_id]
+                return None
+            self._cache.move_to_end(clerk_id)
+            return user
+
+    def cache(self, user: User):
+        if self.max_size <= 0:
+            return
+        # Detached copy, safe to share across sessions/threads
+        snapshot = User(**user.model_dump())
+        with self._lock:
+            self._cache[user.clerk_id] = (time.monotonic() + self.ttl, snapshot)
+            self._cache.move_to_end(user.clerk_id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, clerk_id: Optional[str] = None):
+        """Drop one user (after profile changes) or everything."""
+        with self._lock:
+            if clerk_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(clerk_id, None)
+
+    def _insert_ignore(self, dialect: str):
+        if dialect == "sqlite":
+            return sqlite_insert(User)
+        if dialect == "postgresql":
+            return pg_insert(User)
+        return None
+
+    def get_or_create(self, db: Session, clerk_id: str) -> User:
+        user = self.get_cached(clerk_id)
+        if user:
+            return user
+
+        user = db.exec(select(User).where(User.clerk_id == clerk_id)).first()
+        if not user:
+            # Auto-create on first login
+            values = {"clerk_id": clerk_id, "email": f"{clerk_id}@clerk.dev", "is_active": True} # Placeholder email
+            stmt = self._insert_ignore(db.get_bind().dialect.name)
+            if stmt is not None:
+                db.exec(stmt.values(**values).on_conflict_do_nothing())
+                db.commit()
+            else:
+                db.add(User(**values))
+                db.commit()
+            user = db.exec(select(User).where(User.clerk_id == clerk_id)).one()
+
+        self.cache(user)
+        return user
+
+    async def aget_or_create(self, db: AsyncSession, clerk_id: str) -> User:
+        """Async twin of `get_or_create` for the event-loop request path."""
+        user = self.get_cached(clerk_id)
+        if user:
+            return user
+
+        user = (await db.exec(select(User).where(User.clerk_id == clerk_id))).first()
+        if not user:
+            values = {"clerk_id": clerk_id, "email": f"{clerk_id}@clerk.dev", "is_active": True} # Placeholder email
+            stmt = self._insert_ignore(db.bind.dialect.name)
+            if stmt is not None:
+                await db.exec(stmt.values(**values).on_conflict_do_nothing())
+            else:
+                db.add(User(**values))
+            await db.commit()
+            user = (await db.exec(select(User).where(User.clerk_id == clerk_id))).one()
+
+        self.cache(user)
+        return user
+
+user_service = UserService(
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
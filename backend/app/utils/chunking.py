@@ -0,0 +1,79 @@
+
+import re
+
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count without a tokenizer: about 4 characters or 0.75
+    words per token for English, whichever is larger.
+    """
+    return max(len(text) // 4, len(text.split()) * 4 // 3)
+
+def _word_runs(text: str, max_tokens: int) -> list[str]:
+    """Consecutive words grouped so each run stays within `max_tokens` (a single longer word stands alone)."""
+    runs, current, chars = [], [], 0
+    for word in text.split():
+        # estimate_tokens of the joined run, kept incrementally
+        joined = chars + len(word) + bool(current)
+        if current and max(joined // 4, (len(current) + 1) * 4 // 3) > max_tokens:
+            runs.append(" ".join(current))
+            current, joined = [], len(word)
+        current.append(word)
+        chars = joined
+    if current:
+        runs.append(" ".join(current))
+    return runs
+
+def _pieces(text: str, max_tokens: int) -> list[tuple[str, str]]:
+    """
+    (piece, separator) pairs: whole paragraphs where they fit, else their
+    lines, else sentences, else runs of words. The separator is what joined
+    the piece to the one before it in the original text.
+    """
+    pieces = []
+    for paragraph in _PARAGRAPH.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append((paragraph, "\n\n"))
+            continue
+        sep = "\n\n"
+        for line in paragraph.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            units = [line] if estimate_tokens(line) <= max_tokens else _SENTENCE_END.split(line)
+            for unit in units:
+                if estimate_tokens(unit) <= max_tokens:
+                    pieces.append((unit, sep))
+                else:
+                    for run in _word_runs(unit, max_tokens):
+                        pieces.append((run, sep))
+                        sep = " "
+                sep = " "
+            sep = "\n"
+    return pieces
+
+def split_text(text: str, max_tokens: int) -> list[str]:
+    """
+    Splits `text` into chunks of at most ~`max_tokens`, on paragraph
+    boundaries where possible, else line, sentence, then word boundaries.
+    Short text comes back as a single chunk.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks, current, size = [], "", 0
+    for piece, sep in _pieces(text, max_tokens):
+        cost = estimate_tokens(piece)
+        if current and size + cost > max_tokens:
+            chunks.append(current)
+            current, size = "", 0
+        current = f"{current}{sep}{piece}" if current else piece
+        size += cost
+    if current:
+        chunks.append(current)
+    return chunks
@@ -1,5 +1,8 @@
 
-from datetime import datetime
+import re
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Optional
 
 def get_current_context():
     """Returns detailed date context for LLM"""
@@ -9,3 +12,164 @@ def get_current_context():
 - Current Time: {now.strftime('%H:%M')}
 - Week Number: {now.strftime('%W')}
 - Year: {now.strftime('%Y')}"""
+
+def get_context_date():
+    """The 'Today' the LLM sees in get_current_context, as YYYY-MM-DD"""
+    return datetime.now().strftime('%Y-%m-%d')
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "couple of": 2, "few": 3,
+}
+
+_WEEKDAY = "|".join(WEEKDAYS)
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_COUNT = r"\d{1,3}|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+
+# Explicit dates win over relative ones; otherwise the earliest (then
+# longest) mention in the text wins
+_PATTERNS = [
+    ("iso", re.compile(r"\b(\d{4})[-/](\d{1,2})[-/](\d{1,2})\b")),
+    ("month_day", re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s+(\d{{4}}))?", re.IGNORECASE)),
+    ("day_month", re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})\b\.?(?:,?\s+(\d{{4}}))?", re.IGNORECASE)),
+    ("day_after_tomorrow", re.compile(r"\bday after tomorrow\b", re.IGNORECASE)),
+    ("tomorrow", re.compile(r"\b(tomorrow|tmrw|tmr)\b", re.IGNORECASE)),
+    ("yesterday", re.compile(r"\byesterday\b", re.IGNORECASE)),
+    ("today", re.compile(r"\b(today|tonight|eod|this (morning|afternoon|evening))\b", re.IGNORECASE)),
+    ("in_count", re.compile(rf"\bin\s+(?:a\s+)?({_COUNT})\s+(day|week)s?\b", re.IGNORECASE)),
+    ("end_of_week", re.compile(r"\b(?:end of (?:the |this )?week|eow)\b", re.IGNORECASE)),
+    ("end_of_month", re.compile(r"\b(?:end of (?:the |this )?month|eom)\b", re.IGNORECASE)),
+    ("next_weekend", re.compile(r"\bnext weekend\b", re.IGNORECASE)),
+    ("weekend", re.compile(r"\b(?:this )?weekend\b", re.IGNORECASE)),
+    ("next_week", re.compile(r"\bnext week\b", re.IGNORECASE)),
+    ("this_week", re.compile(r"\bthis week\b", re.IGNORECASE)),
+    ("next_month", re.compile(r"\bnext month\b", re.IGNORECASE)),
+    ("weekday", re.compile(rf"\b(?:(this|next|last|coming)\s+)?({_WEEKDAY})\b", re.IGNORECASE)),
+]
+
+# Date-looking text the patterns above don't understand; the LLM decides.
+# "may" is left out, it is far more often the verb.
+_MONTH_HINT = "|".join(m for m in sorted(MONTHS, key=len, reverse=True) if m != "may")
+_UNRESOLVED = re.compile(
+    rf"\b({_MONTH_HINT}|\d{{1,2}}(st|nd|rd|th)|\d{{1,2}}/\d{{1,2}}(/\d{{2,4}})?|week|month|year|quarter)\b",
+    re.IGNORECASE,
+)
+
+_EXPLICIT = ("iso", "month_day", "day_month")
+
+# Words before "may" that make it the month ("by may 3") rather than the verb
+_DATE_PREPOSITIONS = {"on", "by", "until", "till", "before", "after", "from", "since", "due", "for", "in", "of"}
+_ORDINAL = re.compile(r"\d(st|nd|rd|th)\b", re.IGNORECASE)
+
+def _verb_may(kind: str, match: re.Match) -> bool:
+    """
+    "I may 3 times call" is not May 3rd. "may" only counts as the month with
+    an ordinal, a year, "of", a preposition before it, or at the very start.
+    """
+    if kind not in ("month_day", "day_month"):
+        return False
+    if match.group(1 if kind == "month_day" else 2).lower() != "may":
+        return False
+    if match.group(3) or _ORDINAL.search(match.group(0)) or " of " in match.group(0).lower():
+        return False
+    if kind == "day_month":
+        return True
+    before = match.string[:match.start()].split()
+    return bool(before) and before[-1].lower().strip(",") not in _DATE_PREPOSITIONS
+
+def _count(word: str) -> int:
+    word = word.lower()
+    return int(word) if word.isdigit() else NUMBER_WORDS[word]
+
+def _explicit(today: date, year: Optional[str], month: int, day: int) -> Optional[date]:
+    try:
+        if year:
+            return date(int(year), month, day)
+        resolved = date(today.year, month, day)
+    except ValueError:
+        return None
+    # A yearless date that already passed means next year's
+    if resolved < today - timedelta(days=7):
+        try:
+            resolved = date(today.year + 1, month, day)
+        except ValueError:
+            return None
+    return resolved
+
+def _resolve(kind: str, match: re.Match, today: date) -> Optional[date]:
+    monday = today - timedelta(days=today.weekday())
+    if kind == "iso":
+        return _explicit(today, match.group(1), int(match.group(2)), int(match.group(3)))
+    if kind == "month_day":
+        return _explicit(today, match.group(3), MONTHS[match.group(1).lower()], int(match.group(2)))
+    if kind == "day_month":
+        return _explicit(today, match.group(3), MONTHS[match.group(2).lower()], int(match.group(1)))
+    if kind == "day_after_tomorrow":
+        return today + timedelta(days=2)
+    if kind == "tomorrow":
+        return today + timedelta(days=1)
+    if kind == "yesterday":
+        return today - timedelta(days=1)
+    if kind == "today":
+        return today
+    if kind == "in_count":
+        n = _count(match.group(1))
+        return today + timedelta(days=n * (7 if match.group(2).lower() == "week" else 1))
+    if kind == "end_of_week":
+        return max(today, monday + timedelta(days=4))
+    if kind == "end_of_month":
+        return today.replace(day=calendar.monthrange(today.year, today.month)[1])
+    if kind == "next_weekend":
+        return monday + timedelta(days=12)
+    if kind == "weekend":
+        return max(today, monday + timedelta(days=5))
+    if kind == "next_week":
+        return monday + timedelta(days=7)
+    if kind == "this_week":
+        return today
+    if kind == "next_month":
+        return (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    if kind == "weekday":
+        modifier = (match.group(1) or "").lower()
+        target = WEEKDAYS.index(match.group(2).lower())
+        if modifier == "next":
+            # Friday of the following week, not the coming Friday
+            return monday + timedelta(days=7 + target)
+        if modifier == "last":
+            return today - timedelta(days=(today.weekday() - target - 1) % 7 + 1)
+        # Bare / "this" / "coming": the next occurrence, today included
+        return today + timedelta(days=(target - today.weekday()) % 7)
+    return None
+
+def resolve_target_date(text: str, today: Optional[date] = None) -> Optional[str]:
+    """
+    Resolves the date a note refers to without the LLM, as YYYY-MM-DD.
+
+    An explicit date ("March 14", "2026-03-14") wins, else the earliest
+    relative one ("tomorrow", "next Friday", "in 3 days"); text with no
+    date at all resolves to today. Returns None when the text mentions a date we can't
+    pin down ("due the 3rd", "later this month", "Feb 30"), leaving it to the LLM.
+    """
+    today = today or datetime.now().date()
+    found = []
+    for kind, pattern in _PATTERNS:
+        for match in pattern.finditer(text):
+            if not _verb_may(kind, match):
+                found.append((kind not in _EXPLICIT, match.start(), -len(match.group(0)), kind, match))
+    for *_, kind, match in sorted(found, key=lambda f: f[:3]):
+        resolved = _resolve(kind, match, today)
+        if resolved is not None:
+            return resolved.strftime("%Y-%m-%d")
+        if kind in _EXPLICIT:
+            # "2026-02-30", "Feb 30": clearly a date, just not a valid one
+            return None
+
+    if _UNRESOLVED.search(text):
+        return None
+    return today.strftime("%Y-%m-%d")
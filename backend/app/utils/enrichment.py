@@ -0,0 +1,53 @@
+
+import re
+
+# Status rules per category (same as agent.property_creator_node's prompt)
+DEFAULT_STATUS = {"Task": "To Do", "Idea": "Draft", "Note": "Active"}
+
+# tag -> keywords that imply it (whole-word, case-insensitive)
+TAG_VOCABULARY = {
+    "meeting": ["meeting", "standup", "stand-up", "sync", "1:1", "agenda", "minutes", "retro"],
+    "work": ["client", "manager", "team", "project", "deadline", "report", "quarterly", "colleague", "office"],
+    "engineering": ["api", "bug", "deploy", "database", "code", "backend", "frontend", "latency", "caching", "redis", "server", "refactor"],
+    "email": ["email", "e-mail", "inbox", "reply"],
+    "call": ["call", "phone", "ring"],
+    "finance": ["invoice", "budget", "payment", "pay", "bank", "tax", "expense", "salary"],
+    "health": ["doctor", "dentist", "gym", "workout", "run", "medicine", "appointment"],
+    "shopping": ["buy", "groceries", "order", "purchase", "shop"],
+    "travel": ["flight", "hotel", "trip", "travel", "airport", "booking"],
+    "learning": ["read", "article", "course", "learn", "book", "tutorial", "study"],
+    "urgent": ["urgent", "asap", "immediately", "critical"],
+}
+
+_TAG_PATTERNS = {
+    tag: re.compile(r"(?<![\w-])(" + "|".join(re.escape(k) for k in keywords) + r")(?![\w-])", re.IGNORECASE)
+    for tag, keywords in TAG_VOCABULARY.items()
+}
+
+# Notion's multi_select is capped at this many tags by _build_properties
+MAX_TAGS = 5
+
+def derive_status(category: str) -> str:
+    """Notion status from the category; the same vocabulary the LLM is given (Active/To Do/Draft)."""
+    return DEFAULT_STATUS.get(category, "Active")
+
+def derive_tags(*texts: str, limit: int = 3) -> list[str]:
+    """Vocabulary tags whose keywords appear in `texts`, most hits first."""
+    text = "\n".join(t for t in texts if t)
+    hits = {}
+    for tag, pattern in _TAG_PATTERNS.items():
+        count = len(pattern.findall(text))
+        if count:
+            hits[tag] = count
+    return sorted(hits, key=lambda t: -hits[t])[:limit]
+
+def enrich(category: str, title: str, content: str, tags: list[str], input_text: str = "") -> tuple[str, list[str]]:
+    """
+    Deterministic stand-in for the LLM property creator.
+    Returns (status, all_tags): at most MAX_TAGS tags, the category first so
+    it is never the one cut.
+    """
+    status = derive_status(category)
+    extra = derive_tags(title, content, input_text)
+    all_tags = list(dict.fromkeys([category] + tags + extra))[:MAX_TAGS]
+    return status, all_tags
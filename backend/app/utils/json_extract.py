@@ -0,0 +1,187 @@
+
+import json
+import re
+from typing import Any, Optional
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_PARTIAL_LITERAL = r"(t|tr|tru|f|fa|fal|fals|n|nu|nul|-)"
+
+class _Scanner:
+    """
+    Bracket and string state of the JSON object opening at `start`,
+    advanced incrementally as `text` grows so a stream is scanned once.
+    """
+
+    def __init__(self, text: str, start: int):
+        self.text = text
+        self.start = start
+        self.pos = start
+        self.stack: list[str] = []
+        self.in_string = False
+        self.escaped = False
+        self.string_start = -1
+        self.end: Optional[int] = None  # Index just past the matching close
+        self.commas: list[int] = []  # Top-level member separators
+
+    def advance(self, text: Optional[str] = None) -> "_Scanner":
+        if text is not None:
+            self.text = text
+        if self.end is not None:
+            return self
+        text = self.text
+        for i in range(self.pos, len(text)):
+            ch = text[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+                self.string_start = i
+            elif ch in "{[":
+                self.stack.append(ch)
+            elif ch in "}]":
+                if self.stack:
+                    self.stack.pop()
+                if not self.stack:
+                    self.end = self.pos = i + 1
+                    return self
+            elif ch == "," and len(self.stack) == 1:
+                self.commas.append(i)
+        self.pos = len(text)
+        return self
+
+def _strip_trailing_commas(candidate: str) -> str:
+    # Only outside strings: split on quotes and touch the even segments
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', candidate)
+    return "".join(p if i % 2 else _TRAILING_COMMA.sub(r"\1", p) for i, p in enumerate(parts))
+
+def _close(scanner: _Scanner) -> str:
+    """
+    Terminates a truncated object. An open string that is an object value
+    is closed and kept; an open key or array element is dropped, as is a
+    dangling key or comma. Complete members are never dropped.
+    """
+    candidate = scanner.text[scanner.start:scanner.pos]
+    innermost = scanner.stack[-1]
+    if scanner.in_string:
+        before = candidate[:scanner.string_start - scanner.start]
+        if innermost == "{" and before.rstrip().endswith(":"):
+            if scanner.escaped:
+                candidate = candidate[:-1]
+            candidate += '"'
+        else:
+            candidate = before
+    candidate = candidate.rstrip()
+    if innermost == "{":
+        # `{"a": 1, "b"` / `{"a": 1, "b":` -> `{"a": 1`
+        candidate = re.sub(r'(,|\{)\s*"(?:[^"\\]|\\.)*"\s*:?\s*$', r"\1", candidate)
+        # A literal cut short (`tr`, `nul`) becomes null
+        candidate = re.sub(rf"(:\s*){_PARTIAL_LITERAL}$", r"\1null", candidate)
+    else:
+        # ... and is dropped from an array
+        candidate = re.sub(rf"([\[,]\s*){_PARTIAL_LITERAL}$", r"\1", candidate)
+    candidate = re.sub(r"[,:]\s*$", "", candidate)
+    # A number cut short (`12.`, `1e`) keeps the digits so far
+    candidate = re.sub(r"(\d)[.eE+-]+$", r"\1", candidate)
+    closers = {"{": "}", "[": "]"}
+    return candidate + "".join(closers[b] for b in reversed(scanner.stack))
+
+def _loads(candidate: str) -> Any:
+    # strict=False: raw newlines/tabs inside strings (common in markdown
+    # formatted_content) are accepted
+    try:
+        return json.loads(candidate, strict=False)
+    except json.JSONDecodeError:
+        return json.loads(_strip_trailing_commas(candidate), strict=False)
+
+def extract_json(text: str) -> dict:
+    """
+    The first JSON object in an LLM reply.
+
+    Tolerates code fences and prose around the object, trailing commas,
+    and replies cut off mid-object (open strings and brackets are closed,
+    a half-written last member is dropped). Raises json.JSONDecodeError
+    when there is no object to recover.
+    """
+    start = text.find("{")
+    while start != -1:
+        scanner = _Scanner(text, start).advance()
+        if scanner.end is not None:
+            candidate = text[start:scanner.end]
+        else:
+            candidate = _close(scanner)
+        try:
+            result = _loads(candidate)
+            if isinstance(result, dict):
+                return result
+        except json.JSONDecodeError:
+            pass
+        # Not an object after all (e.g. "{braces}" in prose), try the next one
+        start = text.find("{", start + 1)
+    raise json.JSONDecodeError("No JSON object found", text, 0)
+
+class JSONStreamParser:
+    """
+    Incremental `extract_json` over a token stream.
+
+    `feed` returns the top-level fields that became complete with that
+    chunk, so callers can act on e.g. "category" before the reply ends.
+    Each chunk is scanned once and each member parsed once, when the comma
+    (or brace) after it arrives. `result` is the object parsed so far
+    (repaired if still open).
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.emitted: dict[str, Any] = {}
+        self.done = False
+        self._scanner: Optional[_Scanner] = None
+        self._member_start = 0  # Just past the "{" or comma before the next member
+        self._commas_seen = 0
+
+    def _member(self, end: int) -> dict:
+        member = self.buffer[self._member_start:end]
+        self._member_start = end + 1
+        if not member.strip():
+            return {}
+        try:
+            result = _loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return {}
+        return result if isinstance(result, dict) else {}
+
+    def _complete_fields(self) -> dict:
+        if self._scanner is None:
+            start = self.buffer.find("{")
+            if start == -1:
+                return {}
+            self._scanner = _Scanner(self.buffer, start)
+            self._member_start = start + 1
+        scanner = self._scanner.advance(self.buffer)
+
+        fields = {}
+        for comma in scanner.commas[self._commas_seen:]:
+            fields.update(self._member(comma))
+        self._commas_seen = len(scanner.commas)
+        if scanner.end is not None:
+            fields.update(self._member(scanner.end - 1))
+            self.done = True
+        return fields
+
+    def feed(self, chunk: str) -> dict:
+        if not chunk:
+            return {}
+        self.buffer += chunk
+        if self.done:
+            return {}
+        fields = self._complete_fields()
+        new = {k: v for k, v in fields.items() if k not in self.emitted}
+        self.emitted.update(new)
+        return new
+
+    def result(self) -> dict:
+        return extract_json(self.buffer)
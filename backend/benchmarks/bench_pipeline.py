@@ -0,0 +1,79 @@
+"""
+Latency and output agreement of the LLM pipeline modes.
+
+Runs the same inputs through "quality" (formatter + enricher, two LLM calls)
+and "fast" (one combined call) and reports per-mode latency plus how often
+fast mode agrees with quality mode on category, target date and status.
+Needs a configured provider (GOOGLE_API_KEY / OPENAI_API_KEY / Ollama).
+
+Run from backend/:
+    python -m benchmarks.bench_pipeline --repeat 3
+"""
+
+import argparse
+import statistics
+import time
+from app.services.llm_service import LLMService
+
+CASES = [
+    ("Task", "Remind me to submit the quarterly report by Friday at 5 PM. Also need to email the client."),
+    ("Idea", "App concept: 'Uber for Dog Walkers'. Use geolocation to find nearby walkers. Features: Real-time tracking, rating system, poop bag usage stats."),
+    ("Note", "Meeting Quick Notes:\n- The API response time is too slow (avg 500ms).\n- We need to add Redis caching.\n- John suggested looking into database indexing."),
+    ("Task", "Tomorrow I need to update the HR manager that my friend is going to be interviewed"),
+    ("Idea", "What if the note app could auto-generate a weekly summary every Sunday evening?"),
+    ("Note", "Read an article on SQLite WAL mode: readers don't block writers and checkpoints run in the background."),
+]
+
+FIELDS = ("category", "target_date", "status")
+
+
+def run(service: LLMService, mode: str, text: str):
+    start = time.perf_counter()
+    try:
+        note = service.process_text(text, mode=mode)
+    except Exception as e:
+        print(f"  [{mode}] failed: {e}")
+        note = None
+    return time.perf_counter() - start, note
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per input and mode")
+    args = parser.parse_args()
+
+    service = LLMService()
+    # Every repeat after the first would be a ResultCache hit; time the provider
+    service.cache.max_size = 0
+    latencies = {"quality": [], "fast": []}
+    agree = {f: 0 for f in FIELDS}
+    expected_hits = {"quality": 0, "fast": 0}
+    compared = 0
+
+    for expected, text in CASES:
+        for _ in range(args.repeat):
+            results = {}
+            for mode in ("quality", "fast"):
+                elapsed, note = run(service, mode, text)
+                latencies[mode].append(elapsed)
+                results[mode] = note
+                if note and note.category == expected:
+                    expected_hits[mode] += 1
+            if results["quality"] and results["fast"]:
+                compared += 1
+                for f in FIELDS:
+                    agree[f] += getattr(results["quality"], f) == getattr(results["fast"], f)
+
+    total = len(CASES) * args.repeat
+    print(f"\n{'mode':<10}{'p50 s':>8}{'mean s':>8}{'max s':>8}{'category ok':>13}")
+    for mode, values in latencies.items():
+        print(f"{mode:<10}{statistics.median(values):>8.2f}{statistics.mean(values):>8.2f}{max(values):>8.2f}"
+              f"{expected_hits[mode]:>9}/{total}")
+    print(f"\nfast vs quality agreement over {compared} pairs:")
+    for f in FIELDS:
+        rate = agree[f] / compared if compared else 0.0
+        print(f"  {f:<12}{rate:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Concurrent insert/read benchmark for the SQLite storage profile.
+
+Compares SQLite defaults (rollback journal, synchronous=FULL) with the
+profile from `app.core.config.Settings` on a throwaway database file.
+
+Run from backend/:
+    python -m benchmarks.bench_sqlite --writers 8 --readers 4 --notes 200
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine, select
+from app.db.session import apply_sqlite_pragmas, get_engine_kwargs, get_sqlite_pragmas
+from app.models.note import Note
+
+
+def run_profile(name: str, pragmas: dict, writers: int, readers: int, notes: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, **get_engine_kwargs(url))
+        apply_sqlite_pragmas(engine, pragmas)
+        SQLModel.metadata.create_all(engine)
+
+        stop = threading.Event()
+        counts = {"writes": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def writer(worker_id: int):
+            for i in range(notes):
+                try:
+                    with Session(engine) as db:
+                        db.add(Note(
+                            title=f"Note {worker_id}-{i}",
+                            content="- [ ] benchmark item\n" * 5,
+                            category="Task",
+                            target_date="2026-01-01",
+                            tags=["bench"],
+                            owner_id=f"user_{worker_id % 4}",
+                        ))
+                        db.commit()
+                    with lock:
+                        counts["writes"] += 1
+                except OperationalError:
+                    with lock:
+                        counts["errors"] += 1
+
+        def reader(worker_id: int):
+            while not stop.is_set():
+                try:
+                    with Session(engine) as db:
+                        db.exec(
+                            select(Note)
+                            .where(Note.owner_id == f"user_{worker_id % 4}")
+                            .order_by(Note.id.desc())
+                            .limit(20)
+                        ).all()
+                    with lock:
+                        counts["reads"] += 1
+                except OperationalError:
+                    with lock:
+                        counts["errors"] += 1
+
+        write_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        read_threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+
+        start = time.perf_counter()
+        for t in read_threads + write_threads:
+            t.start()
+        for t in write_threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for t in read_threads:
+            t.join()
+        engine.dispose()
+
+    return {
+        "profile": name,
+        "seconds": elapsed,
+        "writes_per_sec": counts["writes"] / elapsed,
+        "reads_per_sec": counts["reads"] / elapsed,
+        "errors": counts["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--notes", type=int, default=200, help="Inserts per writer")
+    args = parser.parse_args()
+
+    profiles = [
+        ("default", {"journal_mode": "DELETE", "synchronous": "FULL"}),
+        ("tuned", get_sqlite_pragmas()),
+    ]
+    print(f"{'profile':<10}{'seconds':>10}{'writes/s':>12}{'reads/s':>12}{'errors':>8}")
+    for name, pragmas in profiles:
+        r = run_profile(name, pragmas, args.writers, args.readers, args.notes)
+        print(f"{r['profile']:<10}{r['seconds']:>10.2f}{r['writes_per_sec']:>12.1f}{r['reads_per_sec']:>12.1f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
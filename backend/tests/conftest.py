@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+
+# Settings requires the Clerk keys; tests never talk to Clerk, an LLM or Notion.
+# Notes go to a throwaway SQLite file.
+os.environ.setdefault("CLERK_SECRET_KEY", "test")
+os.environ.setdefault("CLERK_PUBLISHABLE_KEY", "test")
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+@pytest.fixture(scope="session")
+def tables():
+    from app.db.session import create_db_and_tables
+    create_db_and_tables()
+
+@pytest.fixture
+def owner(tables) -> str:
+    """A fresh owner id, so tests sharing the database don't see each other's notes."""
+    return f"user-{uuid.uuid4().hex[:8]}"
+
+@pytest.fixture
+def add_notes():
+    """Inserts notes with the sync engine; returns them with ids set."""
+    from sqlmodel import Session
+    from app.db.session import engine
+    from app.models.note import Note
+
+    def add(owner_id: str, rows: list[dict]) -> list[Note]:
+        base = datetime(2026, 1, 1)
+        notes = [
+            Note(
+                title=row.get("title", f"Note {i}"),
+                content=row.get("content", ""),
+                category=row.get("category", "Note"),
+                status=row.get("status", "Active"),
+                target_date=row.get("target_date", "2026-01-01"),
+                tags=row.get("tags", []),
+                owner_id=owner_id,
+                created_at=row.get("created_at", base + timedelta(minutes=i)),
+            )
+            for i, row in enumerate(rows)
+        ]
+        with Session(engine, expire_on_commit=False) as session:
+            session.add_all(notes)
+            session.commit()
+        return notes
+
+    return add
@@ -0,0 +1,29 @@
+import pytest
+from app.services.classifier import classify, load_examples
+
+@pytest.mark.parametrize("text, category", [
+    ("Remind me to call the bank", "Task"),
+    ("- [ ] buy milk\n- [ ] eggs", "Task"),
+    ("todo: renew passport", "Task"),
+    ("Idea: an app for dog walkers", "Idea"),
+    ("App concept: uber for plants", "Idea"),
+    ("What if notes summarized themselves?", "Idea"),
+    ("Meeting notes: API is slow", "Note"),
+])
+def test_rules_decide_obvious_inputs(text, category):
+    assert classify(text) == category
+
+@pytest.mark.parametrize("text", [
+    "what a day",
+    "I need to remember to call mom",  # not anchored at the start
+    "Read an article on SQLite WAL mode",
+    "",
+])
+def test_everything_else_is_left_to_the_llm(text):
+    assert classify(text) is None
+
+def test_rule_hits_agree_with_the_labelled_set():
+    hits = [(classify(text), label) for text, label in load_examples()]
+    hits = [(c, label) for c, label in hits if c is not None]
+    assert hits
+    assert all(c == label for c, label in hits)
@@ -0,0 +1,32 @@
+from datetime import date
+import pytest
+from app.utils.date_tools import resolve_target_date
+
+# (text, today, expected)
+CASES = [
+    ("Call mom tomorrow", "2026-10-17", "2026-10-18"),
+    ("Submit the report by Friday", "2026-10-17", "2026-10-23"),
+    ("Dentist next Friday", "2026-10-14", "2026-10-23"),
+    ("Pay rent in 3 days", "2026-10-17", "2026-10-20"),
+    ("Review PR end of week", "2026-10-13", "2026-10-16"),
+    ("Launch on 2026-11-02", "2026-10-17", "2026-11-02"),
+    ("Trip on March 14", "2026-10-17", "2027-03-14"),
+    ("Party on the 3rd of May", "2026-10-17", "2027-05-03"),
+    ("Due by may 3", "2026-04-20", "2026-05-03"),
+    ("May 3: dentist", "2026-04-20", "2026-05-03"),
+    ("Pick up the parcel day after tomorrow", "2026-10-17", "2026-10-19"),
+    ("Follow up on what we said last Monday", "2026-10-17", "2026-10-12"),
+    ("Call the bank tomorrow, the office on Friday", "2026-10-17", "2026-10-18"),
+    ("Buy milk and eggs", "2026-10-17", "2026-10-17"),
+    ("I may 3 times call the bank", "2026-10-17", "2026-10-17"),
+    ("Those 3 may need a review", "2026-10-17", "2026-10-17"),
+    ("Deadline 2026-02-30", "2026-01-10", None),
+    ("Due Feb 30", "2026-01-10", None),
+    ("Due the 14th", "2026-10-17", None),
+    ("Meet on 3/4", "2026-10-17", None),
+    ("Sometime later this month", "2026-10-17", None),
+]
+
+@pytest.mark.parametrize("text, today, expected", CASES)
+def test_resolve_target_date(text, today, expected):
+    assert resolve_target_date(text, today=date.fromisoformat(today)) == expected
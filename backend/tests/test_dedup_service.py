@@ -0,0 +1,55 @@
+from app.schemas.note import ProcessedNote
+from app.services.dedup_service import NearDuplicateIndex
+
+BASE = "Remind me to submit the quarterly report by Friday afternoon and email the client"
+
+def make_note(title: str = "Quarterly report") -> ProcessedNote:
+    return ProcessedNote(
+        title=title, formatted_content="- submit", category="Task",
+        target_date="2026-10-23", status="To Do", tags=[], properties={},
+    )
+
+def make_index(**kwargs) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(**kwargs)
+    index.add("u1", BASE, make_note())
+    return index
+
+def test_resubmission_with_cosmetic_changes_matches():
+    index = make_index()
+    match = index.find("u1", BASE.lower() + ".")
+    assert match is not None
+    assert match.result.title == "Quarterly report"
+
+def test_small_transcription_difference_matches():
+    assert make_index().find("u1", BASE + "s") is not None
+
+def test_different_date_does_not_match():
+    assert make_index().find("u1", BASE.replace("Friday", "Monday")) is None
+
+def test_different_numbers_do_not_match():
+    index = make_index()
+    index.add("u1", "Meeting at 3pm with the design team about onboarding", make_note("Meeting"))
+    assert index.find("u1", "Meeting at 4pm with the design team about onboarding") is None
+
+def test_one_word_action_change_does_not_match():
+    assert make_index().find("u1", BASE.replace("email", "call")) is None
+
+def test_unrelated_text_does_not_match():
+    assert make_index().find("u1", "Idea: an app that waters plants") is None
+
+def test_users_are_isolated():
+    assert make_index().find("u2", BASE) is None
+
+def test_entries_expire_after_the_window():
+    index = make_index(window_seconds=0)
+    assert index.find("u1", BASE) is None
+
+def test_entries_keep_no_input_text():
+    index = make_index()
+    entry = next(iter(index._users["u1"].entries))
+    assert BASE not in vars(entry).values()
+
+def test_returned_result_is_a_copy():
+    index = make_index()
+    index.find("u1", BASE).result.title = "changed"
+    assert index.find("u1", BASE).result.title == "Quarterly report"
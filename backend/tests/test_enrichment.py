@@ -0,0 +1,22 @@
+import pytest
+from app.utils.enrichment import MAX_TAGS, derive_status, derive_tags, enrich
+
+@pytest.mark.parametrize("category, status", [("Task", "To Do"), ("Idea", "Draft"), ("Note", "Active"), ("Other", "Active")])
+def test_status_stays_in_the_prompt_vocabulary(category, status):
+    assert derive_status(category) == status
+
+def test_checklists_do_not_invent_statuses():
+    status, _ = enrich("Task", "Ship it", "- [x] build\n- [x] deploy\nworking on docs", [])
+    assert status == "To Do"
+
+def test_tags_from_keywords_most_hits_first():
+    assert derive_tags("Email the client about the invoice", "reply to the client's email") == ["email", "work", "finance"]
+
+def test_category_survives_the_tag_cap():
+    _, tags = enrich("Task", "Call the bank", "pay the invoice, email the client", ["a", "b", "c", "d", "e"])
+    assert tags[0] == "Task"
+    assert len(tags) == MAX_TAGS
+
+def test_no_duplicate_tags():
+    _, tags = enrich("Note", "Meeting", "standup meeting", ["meeting", "Note"])
+    assert tags == ["Note", "meeting"]
@@ -0,0 +1,74 @@
+import json
+import pytest
+from app.utils.json_extract import JSONStreamParser, extract_json
+
+REPLY = {
+    "category": "Task",
+    "title": "Quarterly report",
+    "target_date": "2026-10-23",
+    "formatted_content": "## Steps\n- [ ] draft\n- [ ] send, then \"confirm\"",
+    "tags": ["work", "report"],
+    "meta": {"priority": 2, "done": False},
+}
+
+@pytest.mark.parametrize("text", [
+    json.dumps(REPLY),
+    f"```json\n{json.dumps(REPLY, indent=2)}\n```",
+    f"Sure! Here is the note:\n{json.dumps(REPLY)}\nLet me know if you need more.",
+    "Use {braces} carefully. " + json.dumps(REPLY),
+])
+def test_extracts_object_from_surrounding_text(text):
+    assert extract_json(text) == REPLY
+
+def test_trailing_commas():
+    assert extract_json('{"tags": ["a", "b",], "title": "t",}') == {"tags": ["a", "b"], "title": "t"}
+
+def test_raw_newlines_inside_strings():
+    assert extract_json('{"formatted_content": "# H\n- a\n- b"}') == {"formatted_content": "# H\n- a\n- b"}
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"title": "a", "tags": ["x", "y"', {"title": "a", "tags": ["x", "y"]}),
+    ('{"title": "a", "tags": ["x", "y', {"title": "a", "tags": ["x"]}),
+    ('{"title": "a", "tags": ["x", tr', {"title": "a", "tags": ["x"]}),
+    ('{"title": "a", "tags": [1, 2', {"title": "a", "tags": [1, 2]}),
+    ('{"title": "a", "meta": {"b": "c"', {"title": "a", "meta": {"b": "c"}}),
+    ('{"title": "a", "body": "hel', {"title": "a", "body": "hel"}),
+    ('{"title": "a", "body": "line\\', {"title": "a", "body": "line"}),
+    ('{"title": "a", "ta', {"title": "a"}),
+    ('{"title": "a", "tags"', {"title": "a"}),
+    ('{"title": "a", "tags":', {"title": "a"}),
+    ('{"title": "a",', {"title": "a"}),
+    ('{"title": "a", "done": tr', {"title": "a", "done": None}),
+    ('{"title": "a", "n": 12.', {"title": "a", "n": 12}),
+])
+def test_truncated_replies_keep_every_complete_member(text, expected):
+    assert extract_json(text) == expected
+
+def test_no_object_raises():
+    with pytest.raises(json.JSONDecodeError):
+        extract_json("I could not process that note.")
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 1000])
+def test_stream_parser_emits_each_field_once_in_order(chunk_size):
+    text = "```json\n" + json.dumps(REPLY) + "\n```"
+    parser = JSONStreamParser()
+    emitted = []
+    for i in range(0, len(text), chunk_size):
+        for key, value in parser.feed(text[i:i + chunk_size]).items():
+            emitted.append((key, value))
+    assert emitted == list(REPLY.items())
+    assert parser.done
+    assert parser.result() == REPLY
+
+def test_stream_parser_holds_back_the_member_still_being_written():
+    parser = JSONStreamParser()
+    assert parser.feed('{"category": "Idea", "title": "Dog wa') == {"category": "Idea"}
+    assert parser.feed('lkers", ') == {"title": "Dog walkers"}
+    assert parser.result() == {"category": "Idea", "title": "Dog walkers"}
+
+def test_stream_parser_scans_each_chunk_once():
+    parser = JSONStreamParser()
+    parser.feed('{"a": 1, "b": "')
+    scanned = parser._scanner.pos
+    parser.feed("x" * 10)
+    assert parser._scanner.pos == scanned + 10
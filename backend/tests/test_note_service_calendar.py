@@ -0,0 +1,81 @@
+import asyncio
+from datetime import date
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.session import async_engine
+from app.services.note_service import NoteService
+
+START, END = date(2026, 1, 1), date(2026, 1, 31)
+
+def run(service: NoteService, owner: str, start: date = START, end: date = END, wrap=None):
+    async def go():
+        try:
+            async with AsyncSession(async_engine) as db:
+                return await service.calendar(wrap(db) if wrap else db, owner, start, end)
+        finally:
+            # Each asyncio.run gets a new loop; don't hand pooled connections across
+            await async_engine.dispose()
+    return asyncio.run(go())
+
+class WriteDuringRead:
+    """Session stand-in that lets the owner write while the calendar query runs."""
+
+    def __init__(self, db: AsyncSession, service: NoteService, owner: str):
+        self.db, self.service, self.owner = db, service, owner
+
+    async def exec(self, query):
+        result = await self.db.exec(query)
+        self.service.invalidate_owner(self.owner)
+        return result
+
+def test_counts_per_day_and_category(owner, add_notes):
+    add_notes(owner, [
+        {"target_date": "2026-01-02", "category": "Task"},
+        {"target_date": "2026-01-02", "category": "Task"},
+        {"target_date": "2026-01-02", "category": "Idea"},
+        {"target_date": "2026-01-05", "category": "Note"},
+        {"target_date": "2026-02-01", "category": "Note"},  # outside the range
+    ])
+    add_notes("someone-else", [{"target_date": "2026-01-02"}])
+    assert run(NoteService(), owner) == [
+        {"date": "2026-01-02", "total": 3, "categories": {"Task": 2, "Idea": 1}},
+        {"date": "2026-01-05", "total": 1, "categories": {"Note": 1}},
+    ]
+
+def test_cached_until_the_owner_writes(owner, add_notes):
+    service = NoteService()
+    add_notes(owner, [{"target_date": "2026-01-02"}])
+    assert run(service, owner)[0]["total"] == 1
+
+    add_notes(owner, [{"target_date": "2026-01-02"}])
+    assert run(service, owner)[0]["total"] == 1  # served from cache
+    service.invalidate_owner(owner)
+    assert run(service, owner)[0]["total"] == 2
+
+def test_entries_expire_after_the_ttl(owner, add_notes):
+    # Writes from another worker never call invalidate_owner here
+    service = NoteService(calendar_cache_ttl=0)
+    add_notes(owner, [{"target_date": "2026-01-02"}])
+    run(service, owner)
+    add_notes(owner, [{"target_date": "2026-01-02"}])
+    assert run(service, owner)[0]["total"] == 2
+
+def test_ranges_per_user_are_capped(owner, add_notes):
+    service = NoteService(calendar_ranges_per_user=2)
+    for day in (1, 2, 3):
+        run(service, owner, start=date(2026, 1, day))
+    assert list(service._calendar_cache[owner]) == [
+        ("2026-01-02", "2026-01-31"), ("2026-01-03", "2026-01-31"),
+    ]
+
+def test_read_racing_a_write_is_not_cached(owner, add_notes):
+    service = NoteService()
+    add_notes(owner, [{"target_date": "2026-01-02"}])
+    run(service, owner, wrap=lambda db: WriteDuringRead(db, service, owner))
+    assert owner not in service._calendar_cache
+
+def test_disabled_cache_always_queries(owner, add_notes):
+    service = NoteService(calendar_cache_size=0)
+    add_notes(owner, [{"target_date": "2026-01-02"}])
+    run(service, owner)
+    add_notes(owner, [{"target_date": "2026-01-02"}])
+    assert run(service, owner)[0]["total"] == 2
@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.session import async_engine
+from app.services.note_service import NoteService, note_service
+
+def run(owner: str, **kwargs):
+    async def go():
+        try:
+            async with AsyncSession(async_engine) as db:
+                return await note_service.list_notes(db, owner, **kwargs)
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(go())
+
+def pages(owner: str, limit: int, **filters) -> list[list[int]]:
+    result, cursor = [], None
+    while True:
+        notes, cursor = run(owner, limit=limit, cursor=cursor, **filters)
+        result.append([n.id for n in notes])
+        if cursor is None:
+            return result
+
+def test_pages_are_newest_first_without_gaps_or_repeats(owner, add_notes):
+    notes = add_notes(owner, [{} for _ in range(7)])
+    newest_first = [n.id for n in reversed(notes)]
+    assert pages(owner, 3) == [newest_first[:3], newest_first[3:6], newest_first[6:]]
+
+def test_exact_multiple_has_no_empty_last_page(owner, add_notes):
+    add_notes(owner, [{} for _ in range(4)])
+    assert [len(p) for p in pages(owner, 2)] == [2, 2]
+
+def test_ties_on_created_at_are_broken_by_id(owner, add_notes):
+    same = datetime(2026, 3, 1, 9, 0)
+    notes = add_notes(owner, [{"created_at": same} for _ in range(5)])
+    assert sum(pages(owner, 2), []) == sorted((n.id for n in notes), reverse=True)
+
+def test_filters_apply_across_pages(owner, add_notes):
+    notes = add_notes(owner, [
+        {"category": "Task" if i % 2 else "Note", "tags": ["work"] if i < 3 else []}
+        for i in range(6)
+    ])
+    add_notes("someone-else", [{"category": "Task"}])
+    tasks = [n.id for n in reversed(notes) if n.category == "Task"]
+    assert sum(pages(owner, 2, category="Task"), []) == tasks
+    tagged = [n.id for n in reversed(notes) if "work" in n.tags]
+    assert sum(pages(owner, 2, tag="work"), []) == tagged
+
+def test_cursor_round_trip(owner, add_notes):
+    (note,) = add_notes(owner, [{}])
+    assert NoteService.decode_cursor(NoteService.encode_cursor(note)) == (note.created_at, note.id)
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm9waXBl", "MjAyNi0wMS0wMXx4"])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        NoteService.decode_cursor(cursor)
@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from sqlmodel import Session, select
+from app.db.session import async_engine, engine
+from app.models.note import Note
+from app.services.note_writer import NoteWriter
+
+def make_note(owner: str, title) -> Note:
+    return Note(title=title, content="", category="Note", status="Active", target_date="2026-01-01", tags=[], owner_id=owner)
+
+def titles(owner: str) -> list[str]:
+    with Session(engine) as session:
+        return sorted(n.title for n in session.exec(select(Note).where(Note.owner_id == owner)))
+
+def run(coro_fn):
+    async def go():
+        try:
+            return await coro_fn()
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(go())
+
+@pytest.mark.parametrize("mode", ["group", "async"])
+def test_buffered_writes_land(owner, mode):
+    async def go():
+        writer = NoteWriter(mode=mode, interval_ms=5)
+        await writer.start()
+        await asyncio.gather(*(writer.write(make_note(owner, f"n{i}")) for i in range(10)))
+        await writer.stop()
+        return writer
+    writer = run(go)
+    assert titles(owner) == sorted(f"n{i}" for i in range(10))
+    assert writer.rows == 10
+
+def test_group_commit_failure_only_fails_the_bad_note(owner):
+    async def go():
+        writer = NoteWriter(mode="group", interval_ms=50)
+        await writer.start()
+        notes = [make_note(owner, "ok-1"), make_note(owner, None), make_note(owner, "ok-2")]
+        results = await asyncio.gather(*(writer.write(n) for n in notes), return_exceptions=True)
+        await writer.stop()
+        return writer, results
+    writer, results = run(go)
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], Exception)
+    assert titles(owner) == ["ok-1", "ok-2"]
+    assert writer.failed_rows == 1
+
+def test_write_many_is_one_transaction(owner):
+    async def go():
+        await NoteWriter().write_many([make_note(owner, "a"), make_note(owner, "b")])
+    run(go)
+    assert titles(owner) == ["a", "b"]